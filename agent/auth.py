@@ -4,17 +4,11 @@ Authentication management for Helio.
 Handles OpenRouter API key storage securely using OS keychain.
 """
 
+import getpass
 import os
 import sys
 from pathlib import Path
-from typing import Optional
-
-try:
-    import keyring
-    from keyring.errors import KeyringError
-    KEYRING_AVAILABLE = True
-except ImportError:
-    KEYRING_AVAILABLE = False
+from typing import NamedTuple, Optional
 
 # Configuration
 SERVICE_NAME = "helio-pv-cli"
@@ -22,6 +16,102 @@ KEY_NAME = "openrouter-api-key"
 CONFIG_DIR = Path.home() / ".config" / "helio"
 CONFIG_FILE = CONFIG_DIR / "config"
 
+_PROMPT_BANNER = (
+    "\n" + "=" * 60 + "\n"
+    "OpenRouter API Key Required\n"
+    + "=" * 60 + "\n"
+    "\nHelio uses OpenRouter to access AI models.\n"
+    "\nGet your API key at: https://openrouter.ai/keys\n"
+    "(Tip: You can set a credit limit on the key for safety)\n"
+    "\nWe'll store it securely in your system keychain.\n"
+    "You can revoke/rotate it anytime with: helio auth logout\n"
+    "\n" + "=" * 60 + "\n"
+)
+
+
+class AuthResult(NamedTuple):
+    """Outcome of a key store/delete operation."""
+    success: bool
+    message: str
+
+
+# Cached result of the keychain/config-file lookup as (key, location).
+# Keychain access on Linux goes over D-Bus, so the lookup (including a
+# negative result) is done once per process and refreshed by store/delete.
+_UNSET = object()
+_KEY_CACHE = _UNSET
+
+# keyring is imported on first use: on Linux it pulls in the D-Bus /
+# SecretStorage backends, which commands that never touch auth don't need.
+_keyring = None
+_keyring_checked = False
+
+
+def _get_keyring():
+    """Import keyring on first use; return the module, or None if unavailable."""
+    global _keyring, _keyring_checked
+
+    if not _keyring_checked:
+        _keyring_checked = True
+        try:
+            import keyring
+            import keyring.errors
+            _keyring = keyring
+        except ImportError:
+            _keyring = None
+
+    return _keyring
+
+
+_BACKEND_NAME: Optional[str] = None
+
+
+def _backend_name() -> str:
+    """Name of the active keyring backend (backend discovery runs once)."""
+    global _BACKEND_NAME
+
+    if _BACKEND_NAME is None:
+        _BACKEND_NAME = type(_get_keyring().get_keyring()).__name__
+
+    return _BACKEND_NAME
+
+
+def _lookup_stored_key() -> tuple[Optional[str], Optional[str]]:
+    """
+    Look up the stored API key in the OS keychain, then the config file.
+
+    Returns:
+        (key, storage_location), or (None, None) if not found
+    """
+    global _KEY_CACHE
+
+    if _KEY_CACHE is not _UNSET:
+        return _KEY_CACHE
+
+    result = (None, None)
+
+    # Try OS keychain
+    kr = _get_keyring()
+    if kr is not None:
+        try:
+            key = kr.get_password(SERVICE_NAME, KEY_NAME)
+            if key:
+                result = (key.strip(), f"OS keychain ({_backend_name()})")
+        except kr.errors.KeyringError:
+            pass  # Keychain not available, try config file
+
+    # Try config file (fallback); a single read instead of exists() + read
+    if result[0] is None:
+        try:
+            key = CONFIG_FILE.read_text().strip()
+        except (IOError, PermissionError):  # includes FileNotFoundError
+            key = ""
+        if key:
+            result = (key, f"config file ({CONFIG_FILE})")
+
+    _KEY_CACHE = result
+    return result
+
 
 def get_api_key() -> Optional[str]:
     """
@@ -38,28 +128,12 @@ def get_api_key() -> Optional[str]:
     if key:
         return key.strip()
 
-    # 2. Try OS keychain
-    if KEYRING_AVAILABLE:
-        try:
-            key = keyring.get_password(SERVICE_NAME, KEY_NAME)
-            if key:
-                return key.strip()
-        except KeyringError:
-            pass  # Keychain not available, try config file
-
-    # 3. Try config file (fallback)
-    if CONFIG_FILE.exists():
-        try:
-            key = CONFIG_FILE.read_text().strip()
-            if key:
-                return key
-        except (IOError, PermissionError):
-            pass
+    # 2-3. OS keychain, then config file (cached per process)
+    key, _ = _lookup_stored_key()
+    return key
 
-    return None
 
-
-def store_api_key(key: str) -> tuple[bool, str]:
+def store_api_key(key: str) -> AuthResult:
     """
     Store API key securely.
 
@@ -71,54 +145,69 @@ def store_api_key(key: str) -> tuple[bool, str]:
         key: OpenRouter API key (starts with sk-or-...)
 
     Returns:
-        (success: bool, storage_location: str)
+        AuthResult(success, message) - message is the storage location on success
     """
+    global _KEY_CACHE
+
     key = key.strip()
 
     # Validate key format
     if not key.startswith("sk-or-"):
-        return False, "Invalid key format (should start with sk-or-)"
+        return AuthResult(False, "Invalid key format (should start with sk-or-)")
 
     # Try OS keychain first (preferred)
-    if KEYRING_AVAILABLE:
+    kr = _get_keyring()
+    if kr is not None:
         try:
-            keyring.set_password(SERVICE_NAME, KEY_NAME, key)
-            backend = keyring.get_keyring()
-            backend_name = type(backend).__name__
-            return True, f"OS keychain ({backend_name})"
-        except KeyringError as e:
+            kr.set_password(SERVICE_NAME, KEY_NAME, key)
+            backend_name = _backend_name()
+            _KEY_CACHE = (key, f"OS keychain ({backend_name})")
+            return AuthResult(True, f"OS keychain ({backend_name})")
+        except kr.errors.KeyringError as e:
             # Keychain failed, fall back to config file
             pass
 
     # Fallback: config file with restrictive permissions
     try:
         CONFIG_DIR.mkdir(parents=True, exist_ok=True, mode=0o700)
-        CONFIG_FILE.write_text(key)
 
-        # Set restrictive permissions (owner read/write only)
-        if sys.platform != "win32":
-            os.chmod(CONFIG_FILE, 0o600)
-
-        return True, f"Config file ({CONFIG_FILE})"
+        # Write a fresh temp file created with restrictive permissions (owner
+        # read/write only) and atomically move it into place, so the key is
+        # never on disk with a wider mode or half-written
+        tmp_file = CONFIG_FILE.with_suffix(".tmp")
+        tmp_file.unlink(missing_ok=True)  # Left over from an interrupted store
+        fd = os.open(tmp_file, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        try:
+            os.write(fd, key.encode("utf-8"))
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+        os.replace(tmp_file, CONFIG_FILE)
+
+        _KEY_CACHE = (key, f"config file ({CONFIG_FILE})")
+        return AuthResult(True, f"Config file ({CONFIG_FILE})")
     except (IOError, PermissionError) as e:
-        return False, f"Storage failed: {e}"
+        return AuthResult(False, f"Storage failed: {e}")
 
 
-def delete_api_key() -> tuple[bool, str]:
+def delete_api_key() -> AuthResult:
     """
     Delete stored API key from all locations.
 
     Returns:
-        (success: bool, message: str)
+        AuthResult(success, message)
     """
+    global _KEY_CACHE
+
     deleted_from = []
 
     # Try keychain
-    if KEYRING_AVAILABLE:
+    kr = _get_keyring()
+    if kr is not None:
         try:
-            keyring.delete_password(SERVICE_NAME, KEY_NAME)
+            kr.delete_password(SERVICE_NAME, KEY_NAME)
             deleted_from.append("keychain")
-        except KeyringError:
+        except kr.errors.KeyringError:
             pass  # Not found or not available
 
     # Try config file
@@ -129,10 +218,12 @@ def delete_api_key() -> tuple[bool, str]:
         except (IOError, PermissionError):
             pass
 
+    _KEY_CACHE = (None, None)
+
     if deleted_from:
-        return True, f"Deleted from: {', '.join(deleted_from)}"
+        return AuthResult(True, f"Deleted from: {', '.join(deleted_from)}")
     else:
-        return False, "No stored API key found"
+        return AuthResult(False, "No stored API key found")
 
 
 def get_storage_location() -> Optional[str]:
@@ -146,21 +237,9 @@ def get_storage_location() -> Optional[str]:
     if os.environ.get("OPENROUTER_API_KEY"):
         return "environment variable (OPENROUTER_API_KEY)"
 
-    # Check keychain
-    if KEYRING_AVAILABLE:
-        try:
-            if keyring.get_password(SERVICE_NAME, KEY_NAME):
-                backend = keyring.get_keyring()
-                backend_name = type(backend).__name__
-                return f"OS keychain ({backend_name})"
-        except KeyringError:
-            pass
-
-    # Check config file
-    if CONFIG_FILE.exists() and CONFIG_FILE.read_text().strip():
-        return f"config file ({CONFIG_FILE})"
-
-    return None
+    # Check keychain, then config file (shares the get_api_key lookup)
+    _, location = _lookup_stored_key()
+    return location
 
 
 def is_interactive() -> bool:
@@ -175,17 +254,8 @@ def prompt_for_key() -> Optional[str]:
     Returns:
         API key if provided, None if cancelled
     """
-    import getpass
-
-    print("\n" + "=" * 60)
-    print("OpenRouter API Key Required")
-    print("=" * 60)
-    print("\nHelio uses OpenRouter to access AI models.")
-    print("\nGet your API key at: https://openrouter.ai/keys")
-    print("(Tip: You can set a credit limit on the key for safety)")
-    print("\nWe'll store it securely in your system keychain.")
-    print("You can revoke/rotate it anytime with: helio auth logout")
-    print("\n" + "=" * 60)
+    sys.stdout.write(_PROMPT_BANNER)
+    sys.stdout.flush()
 
     try:
         key = getpass.getpass("Enter your OpenRouter API key (or Ctrl+C to cancel): ")
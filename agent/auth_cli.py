@@ -9,8 +9,46 @@ import argparse
 from . import auth
 
 
+def _login() -> int:
+    """helio auth login"""
+    success = auth.interactive_login()
+    return 0 if success else 1
+
+
+def _logout() -> int:
+    """helio auth logout"""
+    success, message = auth.delete_api_key()
+    print("\n" + "=" * 60)
+    print("Helio Logout")
+    print("=" * 60)
+    if success:
+        print(f"\nOK: {message}")
+    else:
+        print(f"\nERROR: {message}")
+    print("=" * 60 + "\n")
+    return 0 if success else 1
+
+
+def _status() -> int:
+    """helio auth status"""
+    auth.show_status()
+    return 0
+
+
+COMMANDS = {
+    "login": _login,
+    "logout": _logout,
+    "status": _status,
+}
+
+
 def main():
     """Entry point for helio auth subcommand."""
+    # Fast path: a bare known command needs no parser (help and errors do)
+    argv = sys.argv[1:]
+    if len(argv) == 1 and argv[0] in COMMANDS:
+        return COMMANDS[argv[0]]()
+
     parser = argparse.ArgumentParser(
         prog="helio auth",
         description="Manage OpenRouter API authentication"
@@ -42,27 +80,7 @@ def main():
         parser.print_help()
         return 1
 
-    if args.command == "login":
-        success = auth.interactive_login()
-        return 0 if success else 1
-
-    elif args.command == "logout":
-        success, message = auth.delete_api_key()
-        print("\n" + "=" * 60)
-        print("Helio Logout")
-        print("=" * 60)
-        if success:
-            print(f"\nOK: {message}")
-        else:
-            print(f"\nERROR: {message}")
-        print("=" * 60 + "\n")
-        return 0 if success else 1
-
-    elif args.command == "status":
-        auth.show_status()
-        return 0
-
-    return 0
+    return COMMANDS[args.command]()
 
 
 if __name__ == "__main__":
@@ -8,224 +8,80 @@ Responsibilities:
 4. Validate spec completeness
 """
 
+import bisect
 import json
-from typing import Tuple, Optional, List
-from agent.schemas.pv_spec_schema import (
-    CanonicalPVSpec, SiteSpec, MetSpec, SystemSpec, OutputSpec,
-    TaskType, MetSource, TrackerMode, TempModel
+import re
+from functools import lru_cache
+from importlib import resources
+from typing import TYPE_CHECKING, Tuple, Optional, List
+
+if TYPE_CHECKING:
+    # Imported lazily at runtime: building the Pydantic models is costly for
+    # commands that never run the clarifier
+    from agent.schemas.pv_spec_schema import CanonicalPVSpec
+
+# Upper bounds (exclusive) of absolute latitude for each climate zone
+_CLIMATE_ZONE_BANDS = (23.5, 35, 50, 66.5)
+_CLIMATE_ZONE_NAMES = (
+    "tropical",
+    "arid",  # Subtropical, often arid
+    "temperate",
+    "continental",
+    "polar",
 )
 
+# Common city names and location indicators
+_LOCATION_KEYWORDS = (
+    'sydney', 'melbourne', 'brisbane', 'perth', 'adelaide',  # Australia
+    'new york', 'los angeles', 'chicago', 'houston', 'phoenix', 'denver', 'boston', 'seattle',  # US
+    'london', 'paris', 'berlin', 'madrid', 'rome',  # Europe
+    'tokyo', 'beijing', 'singapore', 'mumbai', 'delhi',  # Asia
+    'latitude', 'longitude', 'lat', 'lon', '°n', '°s', '°e', '°w'  # Explicit coords
+)
+
+_TIMEFRAME_KEYWORDS = (
+    '2020', '2021', '2022', '2023', '2024', '2025',  # Specific years
+    'january', 'february', 'march', 'april', 'may', 'june',  # Months
+    'july', 'august', 'september', 'october', 'november', 'december',
+    'q1', 'q2', 'q3', 'q4',  # Quarters
+    'summer', 'winter', 'spring', 'fall', 'autumn'  # Seasons
+)
+
+# Phrases suggesting the user wants a specific (not typical) year
+_SPECIFIC_YEAR_KEYWORDS = ('2023', '2024', '2025', 'last year', 'this year')
+
+# Keyword detectors compiled to a single alternation each (one pass over the query)
+_LOCATION_RE = re.compile("|".join(map(re.escape, _LOCATION_KEYWORDS)), re.IGNORECASE)
+_TIMEFRAME_RE = re.compile("|".join(map(re.escape, _TIMEFRAME_KEYWORDS)), re.IGNORECASE)
+
+
+@lru_cache(maxsize=32)
+def _analyze_query(user_query: str) -> Tuple[bool, bool, bool]:
+    """
+    Spec-independent ambiguity features of a prompt: (names a location,
+    has an explicit timeframe, mentions a specific year).
+
+    Cached because detect_ambiguity runs on the same prompt before and
+    after clarification.
+    """
+    return (
+        _LOCATION_RE.search(user_query) is not None,
+        _TIMEFRAME_RE.search(user_query) is not None,
+        any(keyword in user_query.lower() for keyword in _SPECIFIC_YEAR_KEYWORDS),
+    )
+
 
 class ClarifierAgent:
     """Agent that converts user prompts into canonical PV specifications."""
 
-    CLARIFIER_PROMPT = """You are a PV simulation specification clarifier.
-
-Your job: Convert the user's natural language request into a complete, unambiguous PV simulation specification.
-
-INPUT: User prompt (may be underspecified)
-OUTPUT: Canonical PV spec JSON + list of assumptions
-
-Rules:
-1. Extract explicit parameters from user prompt
-2. For missing parameters, choose sensible defaults based on:
-   - Location (e.g., Sydney -> tilt~=latitude, azimuth=0 for N hemisphere tilt north)
-   - Task type (comparison needs matching schemas, sensitivity needs range)
-   - Industry standards (14% system losses, 1.2 DC/AC ratio)
-3. Document ALL assumptions in the "assumptions" field
-4. If task type is COMPARISON, ensure output schema supports comparison structure
-5. Temperature model defaults:
-   - Use SAPM if location has NSRDB data available (US locations)
-   - Use PVSYST otherwise (simpler, fewer params)
-   - Document temp model choice in assumptions
-
-Location Guidelines:
-- If city name given, infer lat/lon (e.g., "Sydney" -> -33.86, 151.21)
-- Infer timezone from location (e.g., Sydney -> "Australia/Sydney")
-- Default altitude to 0 if not specified
-
-Orientation Guidelines:
-- Fixed tilt systems:
-  * Tilt = latitude (optimal for year-round in most climates)
-  * Azimuth = 180° (south) in Northern Hemisphere
-  * Azimuth = 0° (north) in Southern Hemisphere
-- Tracker systems:
-  * Single-axis: N-S aligned (most common)
-  * Dual-axis: No tilt/azimuth needed (tracks sun)
-
-Task Type Detection:
-- "annual energy", "yearly output" -> ANNUAL_YIELD
-- "compare", "vs", "versus" -> COMPARISON
-- "sensitivity", "impact of", "effect of" -> SENSITIVITY
-- "capacity factor", "CF" -> CAPACITY_FACTOR
-- "monthly", "seasonal" -> MONTHLY_PROFILE
-
-Output Schema Guidelines:
-- ANNUAL_YIELD: {{"annual_kwh": float, "capacity_factor": float}}
-- COMPARISON: {{"systems": [{{"name": str, "annual_kwh": float, "capacity_factor": float}}]}}
-- SENSITIVITY: {{"sensitivity": [{{"variable": str, "value": float, "annual_kwh": float}}]}}
-- CAPACITY_FACTOR: {{"capacity_factor": float, "annual_kwh": float}}
-- MONTHLY_PROFILE: {{"monthly_kwh": [float], "months": [str]}}
-
-Examples:
-
-Example 1:
-User: "10 kW system in Sydney, annual energy"
-Output:
-{{
-  "site": {{
-    "latitude": -33.86,
-    "longitude": 151.21,
-    "timezone": "Australia/Sydney",
-    "altitude": 0,
-    "name": "Sydney"
-  }},
-  "met": {{
-    "source": "clearsky",
-    "resolution": "1h"
-  }},
-  "system": {{
-    "dc_capacity_w": 10000,
-    "tilt_deg": 33.86,
-    "azimuth_deg": 0,
-    "tracker_mode": "fixed",
-    "dc_ac_ratio": 1.2,
-    "losses_percent": 14.0,
-    "temp_model": "pvsyst"
-  }},
-  "output": {{
-    "task_type": "annual_yield",
-    "schema": {{
-      "annual_kwh": "float",
-      "capacity_factor": "float"
-    }},
-    "units": {{
-      "annual_kwh": "kWh",
-      "capacity_factor": "dimensionless"
-    }}
-  }},
-  "assumptions": [
-    "Tilt set to latitude (33.86°) for optimal year-round performance",
-    "Azimuth=0° (north-facing in Southern Hemisphere)",
-    "Clearsky weather data used",
-    "PVsyst temperature model (simpler than SAPM)",
-    "14% system losses (industry standard)",
-    "1.2 DC/AC ratio (common for residential)"
-  ]
-}}
-
-Example 2:
-User: "Compare 10kW fixed vs tracking in Denver"
-Output:
-{{
-  "site": {{
-    "latitude": 39.74,
-    "longitude": -104.99,
-    "timezone": "America/Denver",
-    "altitude": 1609,
-    "name": "Denver"
-  }},
-  "met": {{
-    "source": "clearsky",
-    "resolution": "1h"
-  }},
-  "system": {{
-    "dc_capacity_w": 10000,
-    "tilt_deg": 39.74,
-    "azimuth_deg": 180,
-    "tracker_mode": "fixed",
-    "dc_ac_ratio": 1.2,
-    "losses_percent": 14.0,
-    "temp_model": "sapm"
-  }},
-  "output": {{
-    "task_type": "comparison",
-    "schema": {{
-      "systems": [
-        {{
-          "name": "str",
-          "tracker_mode": "str",
-          "annual_kwh": "float",
-          "capacity_factor": "float"
-        }}
-      ]
-    }},
-    "units": {{
-      "annual_kwh": "kWh",
-      "capacity_factor": "dimensionless"
-    }}
-  }},
-  "assumptions": [
-    "Compare fixed-tilt (latitude tilt, south-facing) vs single-axis N-S tracker",
-    "Same DC capacity (10 kW) and losses (14%) for both systems",
-    "SAPM temperature model (Denver is in US, NSRDB data available)",
-    "Clearsky weather data for fair comparison"
-  ],
-  "constraints": [
-    "Same weather data for both systems",
-    "Output must include tracker_mode for identification"
-  ]
-}}
-
-Example 3:
-User: "Temperature sensitivity for Phoenix rooftop"
-Output:
-{{
-  "site": {{
-    "latitude": 33.45,
-    "longitude": -112.07,
-    "timezone": "America/Phoenix",
-    "altitude": 331,
-    "name": "Phoenix"
-  }},
-  "met": {{
-    "source": "clearsky",
-    "resolution": "1h"
-  }},
-  "system": {{
-    "dc_capacity_w": 5000,
-    "tilt_deg": 33.45,
-    "azimuth_deg": 180,
-    "tracker_mode": "fixed",
-    "dc_ac_ratio": 1.2,
-    "losses_percent": 14.0,
-    "temp_model": "noct"
-  }},
-  "output": {{
-    "task_type": "sensitivity",
-    "schema": {{
-      "sensitivity": [
-        {{
-          "temp_model": "str",
-          "annual_kwh": "float",
-          "avg_cell_temp_c": "float"
-        }}
-      ]
-    }},
-    "units": {{
-      "annual_kwh": "kWh",
-      "avg_cell_temp_c": "°C"
-    }}
-  }},
-  "assumptions": [
-    "Rooftop installation -> use NOCT as baseline temp model",
-    "Test sensitivity across temp models: SAPM, PVsyst, Faiman, NOCT",
-    "Default 5 kW system (typical residential rooftop)",
-    "Phoenix climate (hot, high temp impact)"
-  ]
-}}
-
-Now process this user request:
-{user_prompt}
-
-Return JSON in this exact format:
-{{
-  "pv_spec": <CanonicalPVSpec JSON>,
-  "clarification_summary": "<1-2 sentence natural language summary of what will be simulated>"
-}}
-
-IMPORTANT: Return ONLY valid JSON. Do not include markdown code blocks or explanations.
-"""
+    # Prompt text lives in prompt_templates/clarifier.txt (literal JSON braces,
+    # single {user_prompt} placeholder) and is loaded once per process
+    CLARIFIER_PROMPT = (
+        resources.files("agent").joinpath("prompt_templates/clarifier.txt").read_text(encoding="utf-8")
+    )
+
+    # Split once around the placeholder so clarify() only concatenates
+    _PROMPT_PREFIX, _PROMPT_SUFFIX = CLARIFIER_PROMPT.split("{user_prompt}")
 
     def __init__(self, llm_client, logger=None):
         """
@@ -238,7 +94,7 @@ IMPORTANT: Return ONLY valid JSON. Do not include markdown code blocks or explan
         self.llm = llm_client
         self.logger = logger
 
-    def clarify(self, user_prompt: str) -> Tuple[CanonicalPVSpec, str]:
+    def clarify(self, user_prompt: str) -> Tuple["CanonicalPVSpec", str]:
         """
         Convert user prompt to canonical PV spec.
 
@@ -251,8 +107,10 @@ IMPORTANT: Return ONLY valid JSON. Do not include markdown code blocks or explan
         Raises:
             ValueError: If LLM returns invalid spec or fails validation
         """
+        from agent.schemas.pv_spec_schema import CanonicalPVSpec
+
         # Format prompt
-        prompt = self.CLARIFIER_PROMPT.format(user_prompt=user_prompt)
+        prompt = self._PROMPT_PREFIX + user_prompt + self._PROMPT_SUFFIX
 
         # Log start
         if self.logger:
@@ -273,19 +131,16 @@ IMPORTANT: Return ONLY valid JSON. Do not include markdown code blocks or explan
                 })
 
             # Parse response (handle both string and dict responses)
-            if isinstance(response, dict):
+            if isinstance(response, dict) and "message" in response:
                 # Ollama-compatible dict format
-                if "message" in response:
-                    response = response["message"]["content"]
-                else:
-                    # Already parsed dict
-                    result = response
+                response = response["message"]["content"]
 
             if isinstance(response, str):
                 if not response or response.isspace():
                     raise ValueError("LLM returned empty response")
                 result = json.loads(response)
             else:
+                # Already parsed dict - no need to round-trip through JSON
                 result = response
 
             pv_spec_dict = result["pv_spec"]
@@ -321,13 +176,15 @@ IMPORTANT: Return ONLY valid JSON. Do not include markdown code blocks or explan
                 self.logger.log_event("clarifier", "error", {"error": error_msg})
             raise ValueError(error_msg)
 
-    def validate_spec(self, spec: CanonicalPVSpec) -> Optional[str]:
+    def validate_spec(self, spec: "CanonicalPVSpec") -> Optional[str]:
         """
         Validate PV spec for completeness and consistency.
 
         Returns:
             None if valid, error message if invalid
         """
+        from agent.schemas.pv_spec_schema import TaskType, MetSource
+
         # Note: Most validation is done by Pydantic validators in the schema
         # This is for additional cross-field validation
 
@@ -359,19 +216,14 @@ IMPORTANT: Return ONLY valid JSON. Do not include markdown code blocks or explan
         Returns:
             True if valid, False otherwise
         """
-        # Basic bounds check (already done by Pydantic, but extra safety)
-        if not (-90 <= latitude <= 90):
-            return False
-        if not (-180 <= longitude <= 180):
-            return False
-
-        # Check not in ocean (very rough heuristic - just check not in middle of Pacific)
+        # Basic bounds check (already done by Pydantic, but extra safety), then
+        # check not in ocean (very rough heuristic - just check not in middle of Pacific).
         # This is a simple check - real geocoding would be better
-        if -180 <= longitude <= -140 and -40 <= latitude <= 40:
-            # Likely middle of Pacific Ocean
-            return False
-
-        return True
+        return (
+            -90 <= latitude <= 90
+            and -180 <= longitude <= 180
+            and not (longitude <= -140 and -40 <= latitude <= 40)  # Likely middle of Pacific Ocean
+        )
 
     def infer_climate_zone(self, latitude: float) -> str:
         """
@@ -383,21 +235,10 @@ IMPORTANT: Return ONLY valid JSON. Do not include markdown code blocks or explan
         Returns:
             Climate zone: tropical, arid, temperate, continental, polar
         """
-        abs_lat = abs(latitude)
-
-        if abs_lat < 23.5:
-            return "tropical"
-        elif abs_lat < 35:
-            return "arid"  # Subtropical, often arid
-        elif abs_lat < 50:
-            return "temperate"
-        elif abs_lat < 66.5:
-            return "continental"
-        else:
-            return "polar"
+        return _CLIMATE_ZONE_NAMES[bisect.bisect_right(_CLIMATE_ZONE_BANDS, abs(latitude))]
 
     # Phase 3.3: Human-in-Loop Only for Ambiguity
-    def detect_ambiguity(self, user_query: str, pv_spec: Optional[CanonicalPVSpec] = None) -> Optional[str]:
+    def detect_ambiguity(self, user_query: str, pv_spec: Optional["CanonicalPVSpec"] = None) -> Optional[str]:
         """
         Detect if user query is underspecified and requires clarification.
 
@@ -412,17 +253,20 @@ IMPORTANT: Return ONLY valid JSON. Do not include markdown code blocks or explan
             Clarifying question for user, or None if spec is complete
         """
         ambiguities = []
+        has_location, has_timeframe, names_specific_year = _analyze_query(user_query)
 
         # Check location
         if pv_spec is None or not self._has_valid_location(pv_spec):
-            if not self._can_infer_location(user_query):
+            if not has_location:
                 ambiguities.append("location")
 
         # Check timeframe for annual/monthly tasks
-        if pv_spec and pv_spec.output.task_type in [TaskType.ANNUAL_YIELD, TaskType.MONTHLY_PROFILE]:
-            if not self._has_explicit_timeframe(user_query):
+        if pv_spec:
+            from agent.schemas.pv_spec_schema import TaskType
+
+            if pv_spec.output.task_type in [TaskType.ANNUAL_YIELD, TaskType.MONTHLY_PROFILE]:
                 # We can assume a full year, but check if query suggests specific year
-                if any(keyword in user_query.lower() for keyword in ['2023', '2024', '2025', 'last year', 'this year']):
+                if not has_timeframe and names_specific_year:
                     ambiguities.append("timeframe")
 
         if ambiguities:
@@ -430,7 +274,7 @@ IMPORTANT: Return ONLY valid JSON. Do not include markdown code blocks or explan
 
         return None
 
-    def _has_valid_location(self, pv_spec: CanonicalPVSpec) -> bool:
+    def _has_valid_location(self, pv_spec: "CanonicalPVSpec") -> bool:
         """Check if PV spec has valid location data."""
         return (
             pv_spec.site is not None and
@@ -445,18 +289,7 @@ IMPORTANT: Return ONLY valid JSON. Do not include markdown code blocks or explan
 
         Returns True if query contains recognizable location keywords.
         """
-        query_lower = user_query.lower()
-
-        # Common city names and location indicators
-        location_keywords = [
-            'sydney', 'melbourne', 'brisbane', 'perth', 'adelaide',  # Australia
-            'new york', 'los angeles', 'chicago', 'houston', 'phoenix', 'denver', 'boston', 'seattle',  # US
-            'london', 'paris', 'berlin', 'madrid', 'rome',  # Europe
-            'tokyo', 'beijing', 'singapore', 'mumbai', 'delhi',  # Asia
-            'latitude', 'longitude', 'lat', 'lon', '°n', '°s', '°e', '°w'  # Explicit coords
-        ]
-
-        return any(keyword in query_lower for keyword in location_keywords)
+        return _analyze_query(user_query)[0]
 
     def _has_explicit_timeframe(self, user_query: str) -> bool:
         """
@@ -464,18 +297,8 @@ IMPORTANT: Return ONLY valid JSON. Do not include markdown code blocks or explan
 
         Returns True if query specifies time period.
         """
-        query_lower = user_query.lower()
-
-        timeframe_keywords = [
-            '2020', '2021', '2022', '2023', '2024', '2025',  # Specific years
-            'january', 'february', 'march', 'april', 'may', 'june',  # Months
-            'july', 'august', 'september', 'october', 'november', 'december',
-            'q1', 'q2', 'q3', 'q4',  # Quarters
-            'summer', 'winter', 'spring', 'fall', 'autumn'  # Seasons
-        ]
-
         # "annual" without year is NOT explicit
-        return any(keyword in query_lower for keyword in timeframe_keywords)
+        return _analyze_query(user_query)[1]
 
     def _generate_clarifying_question(self, ambiguities: List[str], user_query: str) -> str:
         """
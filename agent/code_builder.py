@@ -8,15 +8,77 @@ Responsibilities:
 4. Ensure code outputs JSON in expected schema format
 """
 
+import ast
+import hashlib
 import json
-from typing import Dict, Any, Optional
+import math
+import string
+from collections import OrderedDict
+from functools import lru_cache
+from types import CodeType
+from typing import Dict, Any, List, Optional, Tuple
 from agent.schemas.pv_spec_schema import CanonicalPVSpec, TaskType, TrackerMode
 
+_FORMATTER = string.Formatter()
+
+# Generated scripts run once per subprocess, so numba's SPA JIT compile (seconds)
+# is paid on every run; it only beats nrel_numpy (~70 ms for 8760 hourly steps)
+# on long series such as sub-hourly multi-month runs
+NUMBA_SPA_MIN_TIMES = 100_000
+
+# Generated code per spec, keyed by a hash of the spec JSON; sweeps and
+# retries rebuild the same specs repeatedly. Values are [code, code object]
+BUILD_CACHE_SIZE = 128
+_BUILD_CACHE: "OrderedDict[bytes, List[Any]]" = OrderedDict()
+
+
+def _spec_key(pv_spec: CanonicalPVSpec) -> bytes:
+    """Stable cache key for a spec (pydantic dumps fields in declaration order)."""
+    return hashlib.blake2b(pv_spec.model_dump_json().encode(), digest_size=16).digest()
+
+
+def _compile_template(template: str) -> List[Tuple[str, Optional[str], str, Optional[str]]]:
+    """Split a str.format template into (literal, field, spec, conversion) segments once."""
+    return list(_FORMATTER.parse(template))
+
+
+def _render_template(segments: List[Tuple[str, Optional[str], str, Optional[str]]],
+                     fields: Dict[str, Any]) -> str:
+    """Render pre-split template segments; equivalent to template.format(**fields)."""
+    parts = []
+    for literal, field, spec, conversion in segments:
+        parts.append(literal)
+        if field is not None:
+            value = fields[field]
+            if conversion:
+                value = _FORMATTER.convert_field(value, conversion)
+            parts.append(format(value, spec))
+    return "".join(parts)
+
+
+@lru_cache(maxsize=256)
+def _check_syntax(code: str) -> Tuple[bool, Optional[str]]:
+    """Parse code to an AST (no bytecode) and cache the verdict per code string."""
+    try:
+        ast.parse(code)
+        return True, None
+    except SyntaxError as e:
+        return False, f"Syntax error at line {e.lineno}: {e.msg}"
+
+
+def _spa_method(start_date: str, end_date: str, freq: str) -> str:
+    """Pick the pvlib solar position method for the expected number of timesteps."""
+    import pandas as pd
+
+    n_times = (pd.Timestamp(end_date) - pd.Timestamp(start_date)) // pd.Timedelta(freq) + 1
+    return 'nrel_numba' if n_times >= NUMBA_SPA_MIN_TIMES else 'nrel_numpy'
+
 
 class CodeBuilderAgent:
     """Agent that generates pvlib simulation code from PV specifications."""
 
     CODE_TEMPLATE_ANNUAL_YIELD = """import pvlib
+import numpy as np
 import pandas as pd
 import json
 from pvlib.pvsystem import pvwatts_dc, pvwatts_losses
@@ -32,7 +94,7 @@ times = pd.date_range('{start_date}', '{end_date}', freq='{freq}', tz=tz)
 location = pvlib.location.Location(lat, lon, tz=tz, altitude=altitude)
 
 # Solar geometry
-solar_pos = location.get_solarposition(times)
+solar_pos = location.get_solarposition(times, method='{spa_method}')
 
 # Irradiance data
 {irradiance_code}
@@ -50,22 +112,27 @@ poa = get_total_irradiance(
     albedo=0.2
 )
 
+# Daylight hours only from here on (night hours contribute zero energy);
+# plain ndarrays, so no index alignment is needed
+day = irrad_data['ghi'].to_numpy() > 0
+poa_global = poa['poa_global'].to_numpy()[day]
+
 # Temperature model
 {temperature_code}
 
 # DC power
 pdc0 = {dc_capacity}  # Watts DC
 gamma_pdc = -0.004  # Temperature coefficient
-dc_power = pvwatts_dc(poa['poa_global'], temp_cell, pdc0=pdc0, gamma_pdc=gamma_pdc)
+dc_power = pvwatts_dc(poa_global, np.asarray(temp_cell), pdc0=pdc0, gamma_pdc=gamma_pdc)
 
-# Losses and AC power
-losses_pct = {losses_percent}
-dc_ac_ratio = {dc_ac_ratio}
-ac_nominal = pdc0 / dc_ac_ratio
-inverter_eff = 0.96
+# Losses ({losses_percent}%) and inverter efficiency (96%) as one multiplier
+ac_multiplier = {ac_multiplier}
+ac_nominal = {ac_nominal}  # pdc0 / dc_ac_ratio ({dc_ac_ratio})
 
-ac_power = dc_power * (1 - losses_pct/100) * inverter_eff
-ac_power = ac_power.clip(upper=ac_nominal)  # Inverter clipping
+# Losses, inverter efficiency and clipping applied in place on one buffer
+ac_power = dc_power
+ac_power *= ac_multiplier
+np.minimum(ac_power, ac_nominal, out=ac_power)  # Inverter clipping
 
 # Results
 {results_code}
@@ -77,6 +144,7 @@ print(json.dumps(result))
 
     # Phase 3.2: Simplified PVWatts template (Fallback Level 2)
     CODE_TEMPLATE_PVWATTS_SIMPLE = """import pvlib
+import numpy as np
 import pandas as pd
 import json
 
@@ -84,8 +152,9 @@ import json
 lat, lon = {latitude}, {longitude}
 tz = '{timezone}'
 
-# Time range (monthly for speed)
-times = pd.date_range('{start_date}', '{end_date}', freq='1h', tz=tz)
+# Time range (one representative mid-month day per month, for speed)
+days = pd.date_range('{start_date}', '{end_date}', freq='MS', tz=tz) + pd.Timedelta(days=14)
+times = days.repeat(24) + pd.to_timedelta(np.tile(np.arange(24), len(days)), unit='h')
 location = pvlib.location.Location(lat, lon, tz=tz)
 
 # Clearsky irradiance (simplified)
@@ -94,16 +163,18 @@ irrad_data = location.get_clearsky(times, model='ineichen')
 # PVWatts simplified model
 from pvlib.pvsystem import pvwatts_dc
 pdc0 = {dc_capacity}  # Watts DC
-dc_power = pvwatts_dc(irrad_data['ghi'], temp_air=25, pdc0=pdc0)
+dc_power = pvwatts_dc(irrad_data['ghi'].to_numpy(), 25, pdc0=pdc0, gamma_pdc=-0.004)
 
 # Simple losses
 losses_pct = {losses_percent}
 ac_power = dc_power * (1 - losses_pct/100) * 0.96
 
-# Results
-annual_kwh = ac_power.sum() / 1000
+# Results: scale each mid-month day by the days in its month
+days_per_month = days.days_in_month.to_numpy()
+monthly_kwh = ac_power.reshape(len(days), 24).sum(axis=1) * days_per_month / 1000
+annual_kwh = float(monthly_kwh.sum())
 dc_kw = pdc0 / 1000
-hours = len(times)
+hours = int(days_per_month.sum()) * 24
 capacity_factor = annual_kwh / (dc_kw * hours)
 
 result = {{
@@ -146,10 +217,12 @@ print(json.dumps(result))
 """
 
     CODE_TEMPLATE_COMPARISON = """import pvlib
+import numpy as np
 import pandas as pd
 import json
 from pvlib.pvsystem import pvwatts_dc, pvwatts_losses
 from pvlib.temperature import sapm_cell, pvsyst_cell
+from pvlib.irradiance import get_total_irradiance
 
 # Site configuration
 lat, lon = {latitude}, {longitude}
@@ -161,11 +234,40 @@ times = pd.date_range('{start_date}', '{end_date}', freq='{freq}', tz=tz)
 location = pvlib.location.Location(lat, lon, tz=tz, altitude=altitude)
 
 # Solar geometry
-solar_pos = location.get_solarposition(times)
+solar_pos = location.get_solarposition(times, method='{spa_method}')
 
 # Irradiance data
 {irradiance_code}
 
+# Sky inputs shared by every configuration (extracted once, reused per system)
+sky = dict(
+    solar_zenith=solar_pos['zenith'],
+    solar_azimuth=solar_pos['azimuth'],
+    dni=irrad_data['dni'],
+    ghi=irrad_data['ghi'],
+    dhi=irrad_data['dhi'],
+)
+
+# POA -> cell temperature -> DC -> AC -> annual energy for one configuration
+def _run_system(name, tracker_mode, surface_tilt, surface_azimuth):
+    poa = get_total_irradiance(
+        surface_tilt=surface_tilt,
+        surface_azimuth=surface_azimuth,
+        albedo=0.2,
+        **sky
+    )
+    poa_global = poa['poa_global'].to_numpy()
+    temp_cell = pvsyst_cell(poa_global, temp_air=25, wind_speed=1)
+    ac = pvwatts_dc(poa_global, temp_cell, pdc0={dc_capacity}, gamma_pdc=-0.004)
+    ac *= {ac_multiplier}
+    annual_kwh = float(np.nansum(ac)) / 1000  # Tracker night rows are NaN
+    return {{
+        "name": name,
+        "tracker_mode": tracker_mode,
+        "annual_kwh": round(annual_kwh, 2),
+        "capacity_factor": round(annual_kwh / ({dc_capacity_kw} * len(times)), 3)
+    }}
+
 # Simulate multiple configurations
 systems = []
 
@@ -176,6 +278,14 @@ result = {{"systems": systems}}
 print(json.dumps(result))
 """
 
+    # Templates pre-split once so each build only joins segments
+    _COMPILED = {
+        "ANNUAL_YIELD": _compile_template(CODE_TEMPLATE_ANNUAL_YIELD),
+        "PVWATTS_SIMPLE": _compile_template(CODE_TEMPLATE_PVWATTS_SIMPLE),
+        "CONSTANT_IRRAD": _compile_template(CODE_TEMPLATE_CONSTANT_IRRAD),
+        "COMPARISON": _compile_template(CODE_TEMPLATE_COMPARISON),
+    }
+
     def __init__(self, llm_client=None):
         """Initialize Code Builder Agent.
 
@@ -194,13 +304,42 @@ print(json.dumps(result))
         Returns:
             Executable Python code string
         """
+        return self._cached_build(pv_spec)[0]
+
+    def build_code_object(self, pv_spec: CanonicalPVSpec) -> CodeType:
+        """Generate and compile code for a spec, reusing the cached code object.
+
+        Args:
+            pv_spec: Validated canonical PV specification
+
+        Returns:
+            Code object ready for exec()
+        """
+        entry = self._cached_build(pv_spec)
+        if entry[1] is None:
+            entry[1] = compile(entry[0], '<pvcode>', 'exec')
+        return entry[1]
+
+    def _cached_build(self, pv_spec: CanonicalPVSpec) -> List[Any]:
+        """Return the [code, code object] cache entry for a spec, building it on a miss."""
+        key = _spec_key(pv_spec)
+        entry = _BUILD_CACHE.get(key)
+        if entry is not None:
+            _BUILD_CACHE.move_to_end(key)
+            return entry
+
         if pv_spec.output.task_type == TaskType.ANNUAL_YIELD:
-            return self._build_annual_yield_code(pv_spec)
+            code = self._build_annual_yield_code(pv_spec)
         elif pv_spec.output.task_type == TaskType.COMPARISON:
-            return self._build_comparison_code(pv_spec)
+            code = self._build_comparison_code(pv_spec)
         else:
             raise NotImplementedError(f"Task type {pv_spec.output.task_type} not yet supported in Phase 2")
 
+        entry = _BUILD_CACHE[key] = [code, None]
+        if len(_BUILD_CACHE) > BUILD_CACHE_SIZE:
+            _BUILD_CACHE.popitem(last=False)
+        return entry
+
     def _build_annual_yield_code(self, spec: CanonicalPVSpec) -> str:
         """Generate code for annual yield calculation."""
 
@@ -218,28 +357,36 @@ print(json.dumps(result))
         # Temperature model code
         if spec.system.temp_model == "sapm":
             temp_params = spec.system.temp_params or {'a': -3.47, 'b': -0.0594, 'deltaT': 3}
-            temperature_code = f"""# SAPM cell temperature
-temp_params = {temp_params}
+            if {'a', 'b', 'deltaT'} <= temp_params.keys():
+                # Wind speed and ambient are constant, so sapm_cell collapses to
+                # temp_air + poa * (exp(a + b*ws) + deltaT/irrad_ref)
+                coeff = (math.exp(temp_params['a'] + temp_params['b'] * 1)
+                         + temp_params['deltaT'] / temp_params.get('irrad_ref', 1000.0))
+                temperature_code = f"""# SAPM cell temperature (25°C ambient, 1 m/s wind folded into one coefficient)
+temp_cell = poa_global * {coeff!r}
+temp_cell += 25"""
+            else:
+                # Model parameters emitted as keyword literals rather than a dict
+                temp_param_args = "".join(f"\n    {name}={value}," for name, value in temp_params.items())
+                temperature_code = f"""# SAPM cell temperature
 temp_cell = sapm_cell(
-    poa['poa_global'],
+    poa_global,
     temp_air=25,  # Assume 25°C ambient
-    wind_speed=1,  # Light wind
-    **temp_params
+    wind_speed=1,  # Light wind{temp_param_args}
 )"""
         elif spec.system.temp_model == "pvsyst":
-            temperature_code = f"""# PVsyst cell temperature
-temp_cell = pvsyst_cell(
-    poa['poa_global'],
-    temp_air=25,
-    wind_speed=1
-)"""
+            # pvsyst_cell defaults: u_c=29, u_v=0, module_efficiency=0.1, alpha_absorption=0.9
+            coeff = 0.9 * (1 - 0.1) / (29.0 + 0.0 * 1)
+            temperature_code = f"""# PVsyst cell temperature (25°C ambient, 1 m/s wind folded into one coefficient)
+temp_cell = poa_global * {coeff!r}
+temp_cell += 25"""
         else:
             # Default to constant 25°C
-            temperature_code = "temp_cell = pd.Series(25, index=times)"
+            temperature_code = "temp_cell = 25.0"
 
         # Results calculation
-        results_code = """annual_kwh = ac_power.sum() / 1000  # Wh to kWh
-hours_in_year = len(times)
+        results_code = """annual_kwh = float(np.nansum(ac_power)) / 1000  # Wh to kWh (nansum matches Series.sum)
+hours_in_year = len(times)  # All hours, including masked night hours
 dc_capacity_kw = pdc0 / 1000
 capacity_factor = annual_kwh / (dc_capacity_kw * hours_in_year)"""
 
@@ -250,25 +397,32 @@ capacity_factor = annual_kwh / (dc_capacity_kw * hours_in_year)"""
     "system": {"dc_kw": dc_capacity_kw, "tilt": %s, "azimuth": %s}
 }""" % (spec.site.name or "Unnamed", spec.system.tilt_deg, spec.system.azimuth_deg)
 
+        # Scalar constants folded here so the script only does array math
+        losses_percent = spec.system.losses_percent or 14.0
+        dc_ac_ratio = spec.system.dc_ac_ratio or 1.2
+
         # Fill template
-        code = self.CODE_TEMPLATE_ANNUAL_YIELD.format(
-            latitude=spec.site.latitude,
-            longitude=spec.site.longitude,
-            timezone=spec.site.timezone,
-            altitude=spec.site.altitude or 0,
-            start_date=start_date,
-            end_date=end_date,
-            freq=freq,
-            irradiance_code=irradiance_code,
-            tilt=spec.system.tilt_deg,
-            azimuth=spec.system.azimuth_deg,
-            temperature_code=temperature_code,
-            dc_capacity=spec.system.dc_capacity_w,
-            losses_percent=spec.system.losses_percent or 14.0,
-            dc_ac_ratio=spec.system.dc_ac_ratio or 1.2,
-            results_code=results_code,
-            result_dict=result_dict
-        )
+        code = _render_template(self._COMPILED["ANNUAL_YIELD"], {
+            "latitude": spec.site.latitude,
+            "longitude": spec.site.longitude,
+            "timezone": spec.site.timezone,
+            "altitude": spec.site.altitude or 0,
+            "start_date": start_date,
+            "end_date": end_date,
+            "freq": freq,
+            "spa_method": _spa_method(start_date, end_date, freq),
+            "irradiance_code": irradiance_code,
+            "tilt": spec.system.tilt_deg,
+            "azimuth": spec.system.azimuth_deg,
+            "temperature_code": temperature_code,
+            "dc_capacity": spec.system.dc_capacity_w,
+            "losses_percent": losses_percent,
+            "dc_ac_ratio": dc_ac_ratio,
+            "ac_multiplier": (1 - losses_percent / 100) * 0.96,
+            "ac_nominal": spec.system.dc_capacity_w / dc_ac_ratio,
+            "results_code": results_code,
+            "result_dict": result_dict
+        })
 
         return code
 
@@ -285,40 +439,21 @@ capacity_factor = annual_kwh / (dc_capacity_kw * hours_in_year)"""
         else:
             raise NotImplementedError(f"Met source {spec.met.source} not supported")
 
+        # Scalar constants folded into _run_system: losses and 96% inverter efficiency as one multiplier
+        ac_multiplier = (1 - (spec.system.losses_percent or 14.0) / 100) * 0.96
+        dc_capacity_kw = spec.system.dc_capacity_w / 1000
+
         # Generate code for each system configuration
         # For comparison, typically fixed vs tracking
         systems_code_parts = []
 
         # Fixed tilt system
-        systems_code_parts.append(f"""
-# System 1: Fixed tilt
-poa_fixed = get_total_irradiance(
-    surface_tilt={spec.system.tilt_deg},
-    surface_azimuth={spec.system.azimuth_deg},
-    solar_zenith=solar_pos['zenith'],
-    solar_azimuth=solar_pos['azimuth'],
-    dni=irrad_data['dni'],
-    ghi=irrad_data['ghi'],
-    dhi=irrad_data['dhi'],
-    albedo=0.2
-)
-temp_cell_fixed = pvsyst_cell(poa_fixed['poa_global'], temp_air=25, wind_speed=1)
-dc_fixed = pvwatts_dc(poa_fixed['poa_global'], temp_cell_fixed, pdc0={spec.system.dc_capacity_w}, gamma_pdc=-0.004)
-ac_fixed = dc_fixed * (1 - {spec.system.losses_percent or 14.0}/100) * 0.96
-annual_kwh_fixed = ac_fixed.sum() / 1000
-cf_fixed = annual_kwh_fixed / ({spec.system.dc_capacity_w}/1000 * len(times))
-
-systems.append({{
-    "name": "Fixed Tilt",
-    "tracker_mode": "fixed",
-    "annual_kwh": round(annual_kwh_fixed, 2),
-    "capacity_factor": round(cf_fixed, 3)
-}})
+        systems_code_parts.append(f"""# System 1: Fixed tilt
+systems.append(_run_system("Fixed Tilt", "fixed", {spec.system.tilt_deg}, {spec.system.azimuth_deg}))
 """)
 
         # Single-axis tracking system
-        systems_code_parts.append(f"""
-# System 2: Single-axis tracker
+        systems_code_parts.append("""# System 2: Single-axis tracker
 from pvlib.tracking import singleaxis
 tracker_data = singleaxis(
     solar_pos['apparent_zenith'],
@@ -329,43 +464,27 @@ tracker_data = singleaxis(
     backtrack=True,
     gcr=0.35
 )
-poa_tracker = get_total_irradiance(
-    surface_tilt=tracker_data['surface_tilt'],
-    surface_azimuth=tracker_data['surface_azimuth'],
-    solar_zenith=solar_pos['zenith'],
-    solar_azimuth=solar_pos['azimuth'],
-    dni=irrad_data['dni'],
-    ghi=irrad_data['ghi'],
-    dhi=irrad_data['dhi'],
-    albedo=0.2
-)
-temp_cell_tracker = pvsyst_cell(poa_tracker['poa_global'], temp_air=25, wind_speed=1)
-dc_tracker = pvwatts_dc(poa_tracker['poa_global'], temp_cell_tracker, pdc0={spec.system.dc_capacity_w}, gamma_pdc=-0.004)
-ac_tracker = dc_tracker * (1 - {spec.system.losses_percent or 14.0}/100) * 0.96
-annual_kwh_tracker = ac_tracker.sum() / 1000
-cf_tracker = annual_kwh_tracker / ({spec.system.dc_capacity_w}/1000 * len(times))
-
-systems.append({{
-    "name": "Single-Axis Tracker",
-    "tracker_mode": "single_axis",
-    "annual_kwh": round(annual_kwh_tracker, 2),
-    "capacity_factor": round(cf_tracker, 3)
-}})
+systems.append(_run_system("Single-Axis Tracker", "single_axis",
+                           tracker_data['surface_tilt'], tracker_data['surface_azimuth']))
 """)
 
         systems_code = "\n".join(systems_code_parts)
 
-        code = self.CODE_TEMPLATE_COMPARISON.format(
-            latitude=spec.site.latitude,
-            longitude=spec.site.longitude,
-            timezone=spec.site.timezone,
-            altitude=spec.site.altitude or 0,
-            start_date=start_date,
-            end_date=end_date,
-            freq=freq,
-            irradiance_code=irradiance_code,
-            systems_code=systems_code
-        )
+        code = _render_template(self._COMPILED["COMPARISON"], {
+            "latitude": spec.site.latitude,
+            "longitude": spec.site.longitude,
+            "timezone": spec.site.timezone,
+            "altitude": spec.site.altitude or 0,
+            "start_date": start_date,
+            "end_date": end_date,
+            "freq": freq,
+            "spa_method": _spa_method(start_date, end_date, freq),
+            "irradiance_code": irradiance_code,
+            "dc_capacity": spec.system.dc_capacity_w,
+            "ac_multiplier": ac_multiplier,
+            "dc_capacity_kw": dc_capacity_kw,
+            "systems_code": systems_code
+        })
 
         return code
 
@@ -378,18 +497,18 @@ systems.append({{
         Returns:
             Simplified PVWatts Python code
         """
-        code = self.CODE_TEMPLATE_PVWATTS_SIMPLE.format(
-            latitude=pv_spec.site.latitude,
-            longitude=pv_spec.site.longitude,
-            timezone=pv_spec.site.timezone,
-            start_date='2024-01-01',
-            end_date='2024-12-31',
-            dc_capacity=pv_spec.system.dc_capacity_w,
-            losses_percent=pv_spec.system.losses_percent or 14.0,
-            tilt=pv_spec.system.tilt_deg,
-            azimuth=pv_spec.system.azimuth_deg,
-            location_name=pv_spec.site.name or "Unnamed"
-        )
+        code = _render_template(self._COMPILED["PVWATTS_SIMPLE"], {
+            "latitude": pv_spec.site.latitude,
+            "longitude": pv_spec.site.longitude,
+            "timezone": pv_spec.site.timezone,
+            "start_date": '2024-01-01',
+            "end_date": '2024-12-31',
+            "dc_capacity": pv_spec.system.dc_capacity_w,
+            "losses_percent": pv_spec.system.losses_percent or 14.0,
+            "tilt": pv_spec.system.tilt_deg,
+            "azimuth": pv_spec.system.azimuth_deg,
+            "location_name": pv_spec.site.name or "Unnamed"
+        })
         return code
 
     def build_constant_irrad(self, pv_spec: CanonicalPVSpec) -> str:
@@ -401,12 +520,12 @@ systems.append({{
         Returns:
             Constant irradiance approximation Python code
         """
-        code = self.CODE_TEMPLATE_CONSTANT_IRRAD.format(
-            latitude=pv_spec.site.latitude,
-            longitude=pv_spec.site.longitude,
-            dc_capacity=pv_spec.system.dc_capacity_w,
-            location_name=pv_spec.site.name or "Unnamed"
-        )
+        code = _render_template(self._COMPILED["CONSTANT_IRRAD"], {
+            "latitude": pv_spec.site.latitude,
+            "longitude": pv_spec.site.longitude,
+            "dc_capacity": pv_spec.system.dc_capacity_w,
+            "location_name": pv_spec.site.name or "Unnamed"
+        })
         return code
 
     def validate_code_syntax(self, code: str) -> tuple[bool, Optional[str]]:
@@ -418,8 +537,4 @@ systems.append({{
         Returns:
             (is_valid, error_message)
         """
-        try:
-            compile(code, '<string>', 'exec')
-            return True, None
-        except SyntaxError as e:
-            return False, f"Syntax error at line {e.lineno}: {e.msg}"
+        return _check_syntax(code)
@@ -5,11 +5,53 @@ This module provides deterministic (non-LLM) logic for reducing multiple
 simulation variant results into final outputs for comparison/sweep tasks.
 """
 
+import ast
+import operator
+import numpy as np
 from typing import Dict, List, Any, Optional
 from agent.task_contract import TaskContract, ReductionSpec, TaskType
 import logging
 
 
+# Arithmetic allowed in gain formulas, e.g. "(tracker - fixed) / fixed * 100"
+_BINARY_OPS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+}
+_UNARY_OPS = {
+    ast.UAdd: operator.pos,
+    ast.USub: operator.neg,
+}
+
+# Parsed gain formulas, keyed by formula string
+_FORMULA_CACHE: Dict[str, ast.AST] = {}
+
+
+def _compile_formula(formula: str) -> ast.AST:
+    """Parse a gain formula once and cache its expression tree."""
+    tree = _FORMULA_CACHE.get(formula)
+    if tree is None:
+        tree = ast.parse(formula, mode="eval").body
+        _FORMULA_CACHE[formula] = tree
+    return tree
+
+
+def _eval_formula(node: ast.AST, namespace: Dict[str, float]) -> float:
+    """Evaluate a parsed formula, allowing only + - * /, numbers and variant names."""
+    if isinstance(node, ast.BinOp) and type(node.op) in _BINARY_OPS:
+        return _BINARY_OPS[type(node.op)](_eval_formula(node.left, namespace),
+                                          _eval_formula(node.right, namespace))
+    if isinstance(node, ast.UnaryOp) and type(node.op) in _UNARY_OPS:
+        return _UNARY_OPS[type(node.op)](_eval_formula(node.operand, namespace))
+    if isinstance(node, ast.Name):
+        return namespace[node.id]
+    if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)):
+        return node.value
+    raise ValueError(f"Unsupported expression in formula: {type(node).__name__}")
+
+
 class DeterministicReducer:
     """
     Reduces multiple simulation variant results into final output.
@@ -52,6 +94,38 @@ class DeterministicReducer:
         else:
             raise ValueError(f"Unknown reduction operation: {reduction.operation}")
 
+    def run_variants(self, contract: TaskContract, variant_specs: List[Any], code_builder,
+                     executor, max_workers: Optional[int] = None,
+                     timeout: int = 60) -> Dict[str, Any]:
+        """
+        Simulate all variants concurrently, then reduce their results.
+
+        Args:
+            contract: Task contract defining reduction operation
+            variant_specs: One CanonicalPVSpec per contract variant, in order
+            code_builder: CodeBuilderAgent used to generate each variant script
+            executor: PythonExecutor used to run each variant script
+            max_workers: Concurrent simulations (default: CPU count)
+            timeout: Per-variant execution timeout in seconds
+
+        Returns:
+            Reduced output, as returned by reduce()
+        """
+        if len(variant_specs) != len(contract.variants):
+            raise ValueError(f"Expected {len(contract.variants)} variant specs, got {len(variant_specs)}")
+
+        # Build scripts up front so code generation errors surface before any run
+        scripts = [code_builder.build_code(spec) for spec in variant_specs]
+        exec_results = executor.execute_many(scripts, timeout=timeout, max_workers=max_workers)
+
+        variant_results = []
+        for variant, exec_result in zip(contract.variants, exec_results):
+            if not exec_result["success"] or not isinstance(exec_result["output"], dict):
+                raise ValueError(f"Variant {variant.name} failed: {exec_result.get('error')}")
+            variant_results.append(exec_result["output"])
+
+        return self.reduce(contract, variant_results)
+
     def _reduce_comparison(self, contract: TaskContract, variant_results: List[Dict[str, Any]],
                           reduction: ReductionSpec) -> Dict[str, Any]:
         """
@@ -161,6 +235,11 @@ class DeterministicReducer:
                     output[field] = optimal_result[metric]
 
         # Add boundary/specific point outputs
+        # Index results by sweep value once (first variant wins on duplicates)
+        results_by_param = {}
+        for variant, result in zip(contract.variants, variant_results):
+            results_by_param.setdefault(variant.parameters.get(sweep_param), result)
+
         for field in reduction.output_fields:
             if field.startswith(f"{sweep_param}_"):
                 # Field like "tilt_0_kwh" or "tilt_60_kwh"
@@ -171,18 +250,17 @@ class DeterministicReducer:
                     param_value = float(param_value_str) if "." in param_value_str else int(param_value_str)
 
                     # Find variant with this parameter value
-                    for variant, result in zip(contract.variants, variant_results):
-                        if variant.parameters.get(sweep_param) == param_value:
-                            # Extract metric from field suffix (e.g., "kwh" from "tilt_0_kwh")
-                            metric_field = "_".join(parts[2:])  # e.g., "kwh"
-                            # Try to find the field - first try the comparison metric, then the parsed field
-                            if metric in result:
-                                output[field] = result[metric]
-                            elif metric_field in result:
-                                output[field] = result[metric_field]
-                            else:
-                                self.logger.warning(f"Could not find metric for {field}")
-                            break
+                    result = results_by_param.get(param_value)
+                    if result is not None:
+                        # Extract metric from field suffix (e.g., "kwh" from "tilt_0_kwh")
+                        metric_field = "_".join(parts[2:])  # e.g., "kwh"
+                        # Try to find the field - first try the comparison metric, then the parsed field
+                        if metric in result:
+                            output[field] = result[metric]
+                        elif metric_field in result:
+                            output[field] = result[metric_field]
+                        else:
+                            self.logger.warning(f"Could not find metric for {field}")
                 except (ValueError, IndexError) as e:
                     self.logger.warning(f"Could not parse sweep field {field}: {e}")
 
@@ -213,8 +291,8 @@ class DeterministicReducer:
             namespace[variant_name] = value
 
         try:
-            # Evaluate formula safely
-            result = eval(formula, {"__builtins__": {}}, namespace)
+            # Evaluate formula safely (arithmetic on variant values only)
+            result = _eval_formula(_compile_formula(formula), namespace)
             return float(result)
         except Exception as e:
             self.logger.error(f"Failed to compute gain with formula '{formula}': {e}")
@@ -246,46 +324,51 @@ class DeterministicReducer:
     def _find_optimal_variant(self, variant_results: List[Dict[str, Any]],
                              metric: str, criterion: str) -> int:
         """Find index of optimal variant based on criterion."""
-        metric_values = []
         for result in variant_results:
             if metric not in result:
                 raise ValueError(f"Metric {metric} not found in result")
-            metric_values.append(result[metric])
 
-        if criterion == "maximize":
-            return metric_values.index(max(metric_values))
-        elif criterion == "minimize":
-            return metric_values.index(min(metric_values))
-        else:
+        if criterion not in ("maximize", "minimize"):
             raise ValueError(f"Unknown optimal criterion: {criterion}")
 
+        metric_values = np.fromiter((result[metric] for result in variant_results),
+                                    dtype=np.float64, count=len(variant_results))
+
+        # argmax/argmin return the first index on ties, like list.index(max(...))
+        if criterion == "maximize":
+            return int(metric_values.argmax())
+        return int(metric_values.argmin())
+
     def _identify_sweep_parameter(self, variants: List) -> str:
         """
         Identify which parameter is being swept.
 
-        Assumes exactly one parameter varies across variants.
+        Assumes exactly one parameter varies across variants; if several do,
+        the first one (in the first variant's parameter order) is returned.
         """
         if not variants:
             raise ValueError("No variants provided")
 
-        # Get all parameter names
-        all_params = set()
-        for variant in variants:
-            all_params.update(variant.parameters.keys())
-
-        # Find parameter that varies
-        varying_params = []
-        for param in all_params:
-            values = [v.parameters.get(param) for v in variants if param in v.parameters]
-            if len(set(values)) > 1:  # Parameter varies
-                varying_params.append(param)
-
-        if len(varying_params) == 0:
-            raise ValueError("No varying parameters found in sweep")
-        if len(varying_params) > 1:
-            self.logger.warning(f"Multiple varying parameters: {varying_params}, using first")
-
-        return varying_params[0]
+        # Scan the first variant's parameters in order and stop at the first
+        # one whose value changes (variants lacking a parameter are skipped)
+        first = variants[0].parameters
+        for param, value in first.items():
+            for variant in variants[1:]:
+                if param in variant.parameters and variant.parameters[param] != value:
+                    return param
+
+        # Parameters the first variant doesn't have
+        seen = {}
+        for variant in variants[1:]:
+            for param, value in variant.parameters.items():
+                if param in first:
+                    continue
+                if param not in seen:
+                    seen[param] = value
+                elif seen[param] != value:
+                    return param
+
+        raise ValueError("No varying parameters found in sweep")
 
 
 def validate_reduction_output(contract: TaskContract, reduced_output: Dict[str, Any]) -> Dict[str, Any]:
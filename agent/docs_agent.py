@@ -1,11 +1,16 @@
-from typing import List, Dict, Any
+import hashlib
+import json
+from concurrent.futures import ThreadPoolExecutor
+from importlib import metadata
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Sequence
 from agent.tools.introspection import IntrospectionTool
 from agent.schemas.api_cards import APICard
 
 # Core pvlib symbols that SimAgent commonly needs.
 # Pre-introspecting these at session start prevents API mismatch drift
 # (e.g., guessing 'poa' instead of 'poa_irradiance').
-CORE_PVLIB_SYMBOLS = [
+CORE_PVLIB_SYMBOLS = (
     # --- PVWatts pipeline (basic) ---
     "pvlib.pvsystem.pvwatts_dc",
     "pvlib.pvsystem.pvwatts_losses",
@@ -45,7 +50,28 @@ CORE_PVLIB_SYMBOLS = [
     # --- Atmosphere ---
     "pvlib.atmosphere.get_relative_airmass",
     "pvlib.atmosphere.get_absolute_airmass",
-]
+)
+
+# Symbol lists shorter than this are introspected serially (pool setup costs more)
+PARALLEL_INTROSPECTION_MIN = 4
+INTROSPECTION_WORKERS = 8
+
+# Serialized core cards persist here across sessions (one file per pvlib
+# version and symbol list, so upgrades and list edits invalidate it)
+CACHE_DIR = Path.home() / ".cache" / "helio"
+
+# Process-wide default tool, shared by every DocsAgent unless one is injected
+_DEFAULT_INTROSPECTION_TOOL = IntrospectionTool()
+
+
+def _core_cards_path() -> Optional[Path]:
+    """Disk cache file for the core cards, or None if pvlib is not installed."""
+    try:
+        pvlib_version = metadata.version("pvlib")
+    except metadata.PackageNotFoundError:
+        return None
+    symbols_hash = hashlib.blake2b("\n".join(CORE_PVLIB_SYMBOLS).encode(), digest_size=8).hexdigest()
+    return CACHE_DIR / f"core_cards-{pvlib_version}-{symbols_hash}.json"
 
 
 class DocsAgent:
@@ -58,9 +84,34 @@ class DocsAgent:
     4. (Future) Supplement with local documentation RAG.
     """
 
-    def __init__(self):
-        self.introspection_tool = IntrospectionTool()
-        self._core_cards_cache: List[Dict[str, Any]] = []
+    def __init__(self, introspection_tool: Optional[IntrospectionTool] = None):
+        self.introspection_tool = introspection_tool or _DEFAULT_INTROSPECTION_TOOL
+        self._core_cards_cache: Dict[str, Dict[str, Any]] = {}
+        self._core_cards_loaded = False  # True once the full core list was preloaded
+        # Per-session card lookups; None marks symbols that failed to resolve
+        self._card_cache: Dict[str, Optional[APICard]] = {}
+        # Serialized cards; APICards are not modified after introspection
+        self._card_json_cache: Dict[str, Dict[str, Any]] = {}
+
+    def _introspect_parallel(self, symbols: Sequence[str],
+                             workers: int = INTROSPECTION_WORKERS) -> List[APICard]:
+        """
+        Introspect symbols on a thread pool, keeping input order.
+
+        Short lists go through introspect_many directly. Root packages are
+        imported serially first: pvlib's submodules import each other, and
+        importing them from several threads at once can trip the import
+        system's deadlock detection.
+        """
+        if len(symbols) < PARALLEL_INTROSPECTION_MIN:
+            return self.introspection_tool.introspect_many(symbols)
+
+        for root in dict.fromkeys(symbol.split('.')[0] for symbol in symbols):
+            self.introspection_tool.get_library_version(root)  # Imports the package
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            cards = pool.map(self.introspection_tool.introspect_symbol, symbols)
+            return [card for card in cards if card]
 
     def retrieve_cards(self, symbols: List[str]) -> List[APICard]:
         """
@@ -69,26 +120,90 @@ class DocsAgent:
         if not symbols:
             return []
 
-        return self.introspection_tool.introspect_many(symbols)
+        # Introspect each unseen symbol once, however often it is requested
+        missing = [symbol for symbol in dict.fromkeys(symbols) if symbol not in self._card_cache]
+        if missing:
+            found = {card.symbol: card for card in self._introspect_parallel(missing)}
+            for symbol in missing:
+                self._card_cache[symbol] = found.get(symbol)
+
+        return [card for card in map(self._card_cache.get, symbols) if card]
 
     def retrieve_cards_as_json(self, symbols: List[str]) -> List[Dict[str, Any]]:
         """
         Returns serialized APICards for the SimAgent.
         """
         cards = self.retrieve_cards(symbols)
-        return [card.model_dump() for card in cards]
+        json_cache = self._card_json_cache
+        result = []
+        for card in cards:
+            card_json = json_cache.get(card.symbol)
+            if card_json is None:
+                card_json = json_cache[card.symbol] = card.model_dump()
+            result.append(card_json)
+        return result
+
+    def get_core_card(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """
+        Return one serialized APICard, introspecting it on first access.
+        """
+        card = self._core_cards_cache.get(symbol)
+        if card is None:
+            api_card = self.introspection_tool.introspect_symbol(symbol)
+            if api_card is None:
+                return None
+            card = self._core_cards_cache[symbol] = api_card.model_dump()
+        return card
+
+    def preload_core_cards(self, symbols: Optional[Sequence[str]] = None) -> None:
+        """
+        Introspect a batch of symbols up front (default: all core symbols).
+
+        The full core list is read from / written to the disk cache (see
+        CACHE_DIR), so introspection only runs once per pvlib version.
+        """
+        full_core = symbols is None
+        if full_core:
+            if self._core_cards_loaded:
+                return
+            self._core_cards_loaded = True
+            symbols = CORE_PVLIB_SYMBOLS
+
+        missing = [symbol for symbol in symbols if symbol not in self._core_cards_cache]
+        if not missing:
+            return
+
+        cache_path = _core_cards_path() if full_core else None
+        if cache_path is not None:
+            try:
+                cached = json.loads(cache_path.read_text(encoding="utf-8"))
+                for card in cached:
+                    self._core_cards_cache.setdefault(card["symbol"], card)
+                return
+            except (OSError, ValueError, KeyError, TypeError):
+                pass  # Missing or corrupt cache file - rebuild below
+
+        for card in self._introspect_parallel(missing):
+            self._core_cards_cache[card.symbol] = card.model_dump()
+
+        if cache_path is not None:
+            try:
+                cache_path.parent.mkdir(parents=True, exist_ok=True)
+                tmp_path = cache_path.with_suffix(".tmp")
+                tmp_path.write_text(json.dumps(self.get_core_cards()), encoding="utf-8")
+                tmp_path.replace(cache_path)
+            except OSError:
+                pass  # Read-only home etc. - the in-memory cache still applies
 
     def get_core_cards(self) -> List[Dict[str, Any]]:
         """
-        Pre-introspect core pvlib symbols and return their APICards.
+        Return serialized APICards for all core pvlib symbols.
 
         This prevents API mismatch drift by giving SimAgent the real
         function signatures (e.g., pvwatts_dc expects 'poa_global' not 'poa').
-        Results are cached after the first call.
+        Preloads every core symbol; callers that only need a few should
+        use get_core_card() instead.
         """
-        if self._core_cards_cache:
-            return self._core_cards_cache
-
-        cards = self.introspection_tool.introspect_many(CORE_PVLIB_SYMBOLS)
-        self._core_cards_cache = [card.model_dump() for card in cards]
-        return self._core_cards_cache
+        self.preload_core_cards()
+        return [self._core_cards_cache[symbol] for symbol in CORE_PVLIB_SYMBOLS
+                if symbol in self._core_cards_cache]
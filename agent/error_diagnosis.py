@@ -8,8 +8,135 @@ Responsibilities:
 4. Learn from error-fix patterns in memory
 """
 
+import hashlib
 import json
-from typing import Dict, Any, List, Optional, Tuple
+import re
+import string
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Deque, Dict, Any, List, Optional, Set, Tuple
+
+# Most recent diagnoses kept in fix_history (older entries are dropped)
+FIX_HISTORY_MAXLEN = 1000
+
+# Previous fixes quoted in the LLM diagnosis prompt (older ones are usually stale)
+LLM_PREVIOUS_FIXES_LIMIT = 3
+
+# Parsed LLM diagnoses kept per agent, keyed by prompt digest
+LLM_DIAGNOSIS_CACHE_SIZE = 128
+
+# Concurrent LLM requests in diagnose_batch
+BATCH_LLM_WORKERS = 4
+
+# Attribute name in e.g. "module 'pvlib' has no attribute 'foo'"
+_ATTR_RE = re.compile(r"attribute '([^']+)'")
+
+# Fixes for physical-check failures, keyed by the failure message's first word
+# (as emitted by SimulationExecutorAgent._check_physical_consistency). The
+# optional second element is a substring the message must also contain.
+# Shared across diagnoses; callers treat fix dicts as read-only.
+_PHYSICAL_FIXES = {
+    'Negative': (None, {
+        'description': 'Fix negative energy calculation',
+        'priority': 'high',
+        'code_change': 'Check for sign errors in power calculations or coordinate system issues',
+        'rationale': 'Energy production cannot be negative'
+    }),
+    'Capacity': ('outside', {
+        'description': 'Correct capacity factor calculation',
+        'priority': 'high',
+        'code_change': 'Verify capacity factor = energy_kwh / (dc_capacity_kw * hours)',
+        'rationale': 'Capacity factor must be between 0 and 1'
+    }),
+    'Monthly': (None, {
+        'description': 'Fix monthly-annual energy mismatch',
+        'priority': 'medium',
+        'code_change': 'Ensure monthly values sum to annual total',
+        'rationale': 'Conservation of energy: monthly must sum to annual'
+    }),
+}
+
+# Static rule-based diagnoses. diagnose() rewrites 'fixes' and may add
+# escalation keys, so _diagnose_simple_error hands out shallow copies.
+_SYNTAX_DIAGNOSIS = {
+    'root_cause': 'Python syntax error in generated code',
+    'problem_type': 'syntax',
+    'fixes': [],  # Filled per call with the offending line number
+    'explanation': 'The generated code has a syntax error that prevents execution.'
+}
+_IMPORT_DIAGNOSIS = {
+    'root_cause': 'Missing or forbidden module import',
+    'problem_type': 'missing_data',
+    'fixes': [{
+        'description': 'Check module availability in venv',
+        'priority': 'high',
+        'code_change': 'Ensure required modules are installed: pvlib, pandas, numpy',
+        'rationale': 'Simulation requires pvlib ecosystem'
+    }],
+    'explanation': 'A required Python module is not available in the execution environment.'
+}
+_TIMEOUT_DIAGNOSIS = {
+    'root_cause': 'Execution exceeded time limit',
+    'problem_type': 'numerical_instability',
+    'fixes': [
+        {
+            'description': 'Reduce time range',
+            'priority': 'high',
+            'code_change': 'Use smaller date range or coarser frequency',
+            'rationale': 'Large time ranges take longer to compute'
+        },
+        {
+            'description': 'Optimize computation',
+            'priority': 'medium',
+            'code_change': 'Use vectorized operations, avoid loops',
+            'rationale': 'Vectorization improves performance'
+        }
+    ],
+    'explanation': 'The simulation took too long to complete. Try reducing the time range or using a coarser time resolution.'
+}
+
+# Hints for undefined variables that usually come from the pvlib pipeline
+_PVLIB_SUGGESTIONS = {
+    'dni': 'Direct Normal Irradiance - use irrad_data["dni"]',
+    'ghi': 'Global Horizontal Irradiance - use irrad_data["ghi"]',
+    'dhi': 'Diffuse Horizontal Irradiance - use irrad_data["dhi"]',
+    'poa': 'Plane of Array - calculate with get_total_irradiance()',
+    'temp_cell': 'Cell temperature - calculate with sapm_cell() or pvsyst_cell()'
+}
+_ATTRIBUTE_DIAGNOSIS = {
+    'root_cause': 'Accessing non-existent attribute or method',
+    'problem_type': 'type_mismatch',
+    'missing_symbols': [],  # Filled per call from the error message
+    'fixes': [{
+        'description': 'Check object type and available methods',
+        'priority': 'high',
+        'code_change': 'Verify object type and consult pvlib documentation',
+        'rationale': 'Attributes must exist on the object'
+    }],
+    'explanation': 'Trying to access an attribute or method that doesn\'t exist on this object.'
+}
+_TYPE_DIAGNOSIS = {
+    'root_cause': 'Type mismatch in operation or function call',
+    'problem_type': 'type_mismatch',
+    'fixes': [{
+        'description': 'Convert types appropriately',
+        'priority': 'high',
+        'code_change': 'Check function argument types (e.g., float() for numbers, pd.Series for arrays)',
+        'rationale': 'Function arguments must match expected types'
+    }],
+    'explanation': 'A function received the wrong type of argument.'
+}
+
+
+@lru_cache(maxsize=1024)
+def _fix_digest(error_class: str, code_change: str) -> int:
+    """64-bit digest of one (error_class, code_change) pair, memoized across calls."""
+    # Combine error class and code change for uniqueness
+    content = f"{error_class}::{code_change}"
+    return int.from_bytes(hashlib.blake2b(content.encode(), digest_size=8).digest(), "little")
 
 
 class ErrorDiagnosisAgent:
@@ -23,34 +150,34 @@ A simulation execution failed. Your job is to:
 3. Prioritize fixes that address root causes
 
 ERROR CONTEXT:
-Error Class: {error_class}
-Error Message: {error_message}
-Line Number: {line_number}
+Error Class: $error_class
+Error Message: $error_message
+Line Number: $line_number
 Stderr Output:
-{stderr}
+$stderr
 
 CODE THAT FAILED:
 ```python
-{code}
+$code
 ```
 
 PREVIOUS FIXES ATTEMPTED:
-{previous_fixes}
+$previous_fixes
 
 Provide your diagnosis in JSON format:
-{{
+{
   "root_cause": "Brief description of the underlying issue",
   "problem_type": "one of: syntax, name_error, type_mismatch, physical_inconsistency, numerical_instability, missing_data, logic_error",
   "fixes": [
-    {{
+    {
       "description": "What this fix does",
       "priority": "high/medium/low",
       "code_change": "Specific code to change or add",
       "rationale": "Why this fix addresses the root cause"
-    }}
+    }
   ],
   "explanation": "Student-friendly explanation of what went wrong"
-}}
+}
 
 Focus on physics-aware fixes like:
 - Mesh resolution adjustments
@@ -60,6 +187,9 @@ Focus on physics-aware fixes like:
 - Data range/timezone corrections
 """
 
+    # Parsed once at class creation; substitute() only fills the placeholders
+    _DIAGNOSIS_TEMPLATE = string.Template(DIAGNOSIS_PROMPT_TEMPLATE)
+
     def __init__(self, llm_client=None):
         """Initialize Error Diagnosis Agent.
 
@@ -67,8 +197,23 @@ Focus on physics-aware fixes like:
             llm_client: LLM client for dynamic diagnosis
         """
         self.llm_client = llm_client
-        self.fix_history: List[Dict[str, Any]] = []
-        self.applied_fix_hashes: set = set()  # No-repeat patch guard
+        self.fix_history: Deque[Dict[str, Any]] = deque(maxlen=FIX_HISTORY_MAXLEN)
+        self.applied_fix_hashes: Set[int] = set()  # No-repeat patch guard (64-bit digests)
+        # temperature=0 diagnoses of an identical prompt are reused across retries
+        self._llm_diagnosis_cache: Dict[bytes, Dict[str, Any]] = {}
+        self._llm_cache_lock = threading.Lock()
+
+        # Rule-based handlers by error class; anything else goes to the LLM
+        self._dispatch = {
+            'syntax': self._diagnose_simple_error,
+            'import': self._diagnose_simple_error,
+            'security': self._diagnose_simple_error,
+            'timeout': self._diagnose_simple_error,
+            'physical': self._diagnose_physical_error,
+            'name_error': self._diagnose_code_error,
+            'attribute_error': self._diagnose_code_error,
+            'type_error': self._diagnose_code_error,
+        }
 
     def diagnose(
         self,
@@ -89,24 +234,62 @@ Focus on physics-aware fixes like:
         error_class = error_context['error_class']
 
         # Use rule-based diagnosis for common cases, LLM for complex ones
-        if error_class in ['syntax', 'import', 'security', 'timeout']:
-            diagnosis = self._diagnose_simple_error(code, error_context)
-        elif error_class == 'physical':
-            diagnosis = self._diagnose_physical_error(code, error_context)
-        elif error_class in ['name_error', 'attribute_error', 'type_error']:
-            diagnosis = self._diagnose_code_error(code, error_context)
+        handler = self._dispatch.get(error_class)
+        if handler is not None:
+            diagnosis = handler(code, error_context)
         else:
             # Complex errors need LLM
             diagnosis = self._diagnose_with_llm(code, error_context, previous_fixes or [])
 
+        return self._finalize_diagnosis(error_class, diagnosis)
+
+    def diagnose_batch(
+        self,
+        items: List[Tuple[str, Dict[str, Any], Optional[List[Dict]]]],
+        max_workers: int = BATCH_LLM_WORKERS
+    ) -> List[Dict[str, Any]]:
+        """Diagnose several failures at once, overlapping the LLM calls.
+
+        Args:
+            items: (code, error_context, previous_fixes) per failure
+            max_workers: Concurrent LLM requests
+
+        Returns:
+            One diagnosis dict per item, in input order (as from diagnose())
+        """
+        diagnoses: List[Optional[Dict[str, Any]]] = [None] * len(items)
+        llm_items = []
+
+        for i, (code, error_context, previous_fixes) in enumerate(items):
+            handler = self._dispatch.get(error_context['error_class'])
+            if handler is not None:
+                diagnoses[i] = handler(code, error_context)
+            else:
+                llm_items.append((i, code, error_context, previous_fixes or []))
+
+        # The LLM client is blocking, so threads overlap the round-trips
+        if len(llm_items) > 1 and self.llm_client:
+            with ThreadPoolExecutor(max_workers=max_workers) as pool:
+                results = pool.map(lambda item: self._diagnose_with_llm(*item[1:]), llm_items)
+                for (i, *_), diagnosis in zip(llm_items, results):
+                    diagnoses[i] = diagnosis
+        else:
+            for i, code, error_context, previous_fixes in llm_items:
+                diagnoses[i] = self._diagnose_with_llm(code, error_context, previous_fixes)
+
+        # Fix filtering and history logging stay sequential, in input order
+        return [self._finalize_diagnosis(error_context['error_class'], diagnosis)
+                for (_, error_context, _), diagnosis in zip(items, diagnoses)]
+
+    def _finalize_diagnosis(self, error_class: str, diagnosis: Dict[str, Any]) -> Dict[str, Any]:
+        """Drop already-applied fixes, flag escalation and log the diagnosis."""
         # Filter out already-tried fixes (no-repeat patch guard)
         fixes = diagnosis.get('fixes', [])
-        novel_fixes = []
-
-        for fix in fixes:
-            fix_hash = self._hash_fix(fix, error_class)
-            if fix_hash not in self.applied_fix_hashes:
-                novel_fixes.append(fix)
+        if self.applied_fix_hashes:
+            novel_fixes = [fix for fix in fixes
+                           if self._hash_fix(fix, error_class) not in self.applied_fix_hashes]
+        else:
+            novel_fixes = list(fixes)  # Nothing applied yet, so every fix is novel
 
         diagnosis['fixes'] = novel_fixes
 
@@ -119,7 +302,7 @@ Focus on physics-aware fixes like:
         self.fix_history.append({
             'error_class': error_class,
             'diagnosis': diagnosis,
-            'timestamp': __import__('time').time()
+            'timestamp': time.time()
         })
 
         return diagnosis
@@ -135,51 +318,20 @@ Focus on physics-aware fixes like:
         error_msg = error_context['error_message']
 
         if error_class == 'syntax':
-            return {
-                'root_cause': 'Python syntax error in generated code',
-                'problem_type': 'syntax',
-                'fixes': [{
-                    'description': 'Fix syntax error',
-                    'priority': 'high',
-                    'code_change': f'Review line {error_context["line_number"]} for syntax issues',
-                    'rationale': 'Code must be syntactically valid Python'
-                }],
-                'explanation': 'The generated code has a syntax error that prevents execution.'
-            }
+            diagnosis = dict(_SYNTAX_DIAGNOSIS)
+            diagnosis['fixes'] = [{
+                'description': 'Fix syntax error',
+                'priority': 'high',
+                'code_change': f'Review line {error_context["line_number"]} for syntax issues',
+                'rationale': 'Code must be syntactically valid Python'
+            }]
+            return diagnosis
 
         elif error_class == 'import':
-            return {
-                'root_cause': 'Missing or forbidden module import',
-                'problem_type': 'missing_data',
-                'fixes': [{
-                    'description': 'Check module availability in venv',
-                    'priority': 'high',
-                    'code_change': 'Ensure required modules are installed: pvlib, pandas, numpy',
-                    'rationale': 'Simulation requires pvlib ecosystem'
-                }],
-                'explanation': 'A required Python module is not available in the execution environment.'
-            }
+            return dict(_IMPORT_DIAGNOSIS)
 
         elif error_class == 'timeout':
-            return {
-                'root_cause': 'Execution exceeded time limit',
-                'problem_type': 'numerical_instability',
-                'fixes': [
-                    {
-                        'description': 'Reduce time range',
-                        'priority': 'high',
-                        'code_change': 'Use smaller date range or coarser frequency',
-                        'rationale': 'Large time ranges take longer to compute'
-                    },
-                    {
-                        'description': 'Optimize computation',
-                        'priority': 'medium',
-                        'code_change': 'Use vectorized operations, avoid loops',
-                        'rationale': 'Vectorization improves performance'
-                    }
-                ],
-                'explanation': 'The simulation took too long to complete. Try reducing the time range or using a coarser time resolution.'
-            }
+            return dict(_TIMEOUT_DIAGNOSIS)
 
         return {
             'root_cause': 'Unknown error type',
@@ -199,29 +351,11 @@ Focus on physics-aware fixes like:
         fixes = []
 
         for failure in physical_failures:
-            if 'Negative' in failure:
-                fixes.append({
-                    'description': 'Fix negative energy calculation',
-                    'priority': 'high',
-                    'code_change': 'Check for sign errors in power calculations or coordinate system issues',
-                    'rationale': 'Energy production cannot be negative'
-                })
-
-            elif 'Capacity factor' in failure and 'outside' in failure:
-                fixes.append({
-                    'description': 'Correct capacity factor calculation',
-                    'priority': 'high',
-                    'code_change': 'Verify capacity factor = energy_kwh / (dc_capacity_kw * hours)',
-                    'rationale': 'Capacity factor must be between 0 and 1'
-                })
-
-            elif 'Monthly sum' in failure:
-                fixes.append({
-                    'description': 'Fix monthly-annual energy mismatch',
-                    'priority': 'medium',
-                    'code_change': 'Ensure monthly values sum to annual total',
-                    'rationale': 'Conservation of energy: monthly must sum to annual'
-                })
+            entry = _PHYSICAL_FIXES.get(failure.split(' ', 1)[0])
+            if entry is not None:
+                required, fix = entry
+                if required is None or required in failure:
+                    fixes.append(fix)
 
         return {
             'root_cause': 'Physical conservation or bounds violation',
@@ -243,15 +377,7 @@ Focus on physics-aware fixes like:
 
         if error_class == 'name_error' and var_name:
             # Check if it's a common pvlib variable
-            pvlib_suggestions = {
-                'dni': 'Direct Normal Irradiance - use irrad_data["dni"]',
-                'ghi': 'Global Horizontal Irradiance - use irrad_data["ghi"]',
-                'dhi': 'Diffuse Horizontal Irradiance - use irrad_data["dhi"]',
-                'poa': 'Plane of Array - calculate with get_total_irradiance()',
-                'temp_cell': 'Cell temperature - calculate with sapm_cell() or pvsyst_cell()'
-            }
-
-            suggestion = pvlib_suggestions.get(var_name, f'Variable "{var_name}" not defined')
+            suggestion = _PVLIB_SUGGESTIONS.get(var_name, f'Variable "{var_name}" not defined')
 
             return {
                 'root_cause': f'Undefined variable: {var_name}',
@@ -268,8 +394,7 @@ Focus on physics-aware fixes like:
         elif error_class == 'attribute_error':
             # Try to extract the attribute name
             # Error msg: module 'pvlib' has no attribute 'foo'
-            import re
-            match = re.search(r"attribute '([^']+)'", error_context.get('error_message', ''))
+            match = _ATTR_RE.search(error_context.get('error_message', ''))
             missing_symbols = []
             if match:
                 attr = match.group(1)
@@ -278,32 +403,13 @@ Focus on physics-aware fixes like:
                 # However, if the error message says "module 'pvlib'...", we know it's pvlib.
                 if "module 'pvlib'" in error_context.get('error_message', ''):
                     missing_symbols.append(f"pvlib.{attr}")
-            
-            return {
-                'root_cause': 'Accessing non-existent attribute or method',
-                'problem_type': 'type_mismatch',
-                'missing_symbols': missing_symbols,
-                'fixes': [{
-                    'description': 'Check object type and available methods',
-                    'priority': 'high',
-                    'code_change': 'Verify object type and consult pvlib documentation',
-                    'rationale': 'Attributes must exist on the object'
-                }],
-                'explanation': 'Trying to access an attribute or method that doesn\'t exist on this object.'
-            }
+
+            diagnosis = dict(_ATTRIBUTE_DIAGNOSIS)
+            diagnosis['missing_symbols'] = missing_symbols
+            return diagnosis
 
         elif error_class == 'type_error':
-            return {
-                'root_cause': 'Type mismatch in operation or function call',
-                'problem_type': 'type_mismatch',
-                'fixes': [{
-                    'description': 'Convert types appropriately',
-                    'priority': 'high',
-                    'code_change': 'Check function argument types (e.g., float() for numbers, pd.Series for arrays)',
-                    'rationale': 'Function arguments must match expected types'
-                }],
-                'explanation': 'A function received the wrong type of argument.'
-            }
+            return dict(_TYPE_DIAGNOSIS)
 
         return {
             'root_cause': f'{error_class} in code',
@@ -335,17 +441,26 @@ Focus on physics-aware fixes like:
             }
 
         # Format prompt
-        previous_fixes_text = json.dumps(previous_fixes, indent=2) if previous_fixes else "None"
+        # Compact JSON, most recent fixes only: fewer prompt tokens for the LLM
+        previous_fixes_text = (
+            json.dumps(previous_fixes[-LLM_PREVIOUS_FIXES_LIMIT:], separators=(',', ':'))
+            if previous_fixes else "None"
+        )
 
-        prompt = self.DIAGNOSIS_PROMPT_TEMPLATE.format(
+        prompt = self._DIAGNOSIS_TEMPLATE.substitute(
             error_class=error_context['error_class'],
             error_message=error_context['error_message'],
             line_number=error_context.get('line_number', 'Unknown'),
-            stderr=error_context.get('stderr', '')[:500],  # Limit stderr
+            stderr=error_context.get('stderr', '')[-500:],  # Traceback tail holds the actual error
             code=code[:1000],  # Limit code
             previous_fixes=previous_fixes_text
         )
 
+        cache_key = hashlib.blake2b(prompt.encode(), digest_size=16).digest()
+        cached = self._llm_diagnosis_cache.get(cache_key)
+        if cached is not None:
+            return dict(cached)  # diagnose() rewrites 'fixes' on the returned dict
+
         # Call LLM
         try:
             response = self.llm_client.chat(
@@ -353,6 +468,12 @@ Focus on physics-aware fixes like:
                 temperature=0.0
             )
             diagnosis = json.loads(response)
+            if isinstance(diagnosis, dict):
+                with self._llm_cache_lock:  # diagnose_batch calls this from worker threads
+                    if len(self._llm_diagnosis_cache) >= LLM_DIAGNOSIS_CACHE_SIZE:
+                        # Evict the oldest entry (dicts keep insertion order)
+                        del self._llm_diagnosis_cache[next(iter(self._llm_diagnosis_cache))]
+                    self._llm_diagnosis_cache[cache_key] = dict(diagnosis)
             return diagnosis
         except Exception as e:
             return {
@@ -380,7 +501,7 @@ Focus on physics-aware fixes like:
 
         return None
 
-    def _hash_fix(self, fix: Dict[str, Any], error_class: str) -> str:
+    def _hash_fix(self, fix: Dict[str, Any], error_class: str) -> int:
         """Hash a fix based on its code_change and error_class.
 
         Args:
@@ -388,12 +509,9 @@ Focus on physics-aware fixes like:
             error_class: Error class this fix addresses
 
         Returns:
-            Hash string for deduplication
+            64-bit integer digest for deduplication
         """
-        import hashlib
-        # Combine error class and code change for uniqueness
-        content = f"{error_class}::{fix.get('code_change', '')}"
-        return hashlib.md5(content.encode()).hexdigest()
+        return _fix_digest(error_class, fix.get('code_change', ''))
 
     def record_fix_applied(self, fix: Dict[str, Any], error_class: str):
         """Mark a fix as applied to prevent re-application.
@@ -405,7 +523,12 @@ Focus on physics-aware fixes like:
         fix_hash = self._hash_fix(fix, error_class)
         self.applied_fix_hashes.add(fix_hash)
 
+    def get_fix_history(self) -> List[Dict[str, Any]]:
+        """Return the retained diagnosis history, oldest first."""
+        return list(self.fix_history)
+
     def clear_fix_history(self):
-        """Clear fix history and applied fix hashes (for new simulation)."""
-        self.fix_history = []
+        """Clear fix history, applied fix hashes and cached LLM diagnoses (for new simulation)."""
+        self.fix_history.clear()
+        self._llm_diagnosis_cache.clear()
         self.applied_fix_hashes = set()
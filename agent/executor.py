@@ -7,6 +7,8 @@ Security Features (Phase 1 Hardening):
 - AST-based blocking of eval/exec/compile
 - Dunder attribute access prevention
 - Resource limits (CPU, memory, file size on Unix)
+- Optional seccomp syscall filter (Linux, requires pyseccomp)
+- Optional cgroup v2 memory/CPU limits (Linux, delegated cgroup via HELIO_CGROUP)
 - Output size limits
 - Optional determinism enforcement
 """
@@ -18,6 +20,15 @@ import os
 import ast
 import time
 import hashlib
+import errno
+import stat
+import locale
+import uuid
+import select
+import selectors
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, Tuple, List, Optional
 
@@ -28,41 +39,255 @@ try:
 except ImportError:
     RESOURCE_AVAILABLE = False
 
+# Optional seccomp filter for child processes (Linux only)
+try:
+    import pyseccomp as seccomp
+    SECCOMP_AVAILABLE = True
+except ImportError:
+    SECCOMP_AVAILABLE = False
+
+# Syscalls a PV simulation never needs: networking, debugging other processes,
+# namespaces/mounts and kernel administration. They fail with EPERM rather than
+# killing the child so scripts get a normal Python exception. This is defense
+# in depth; the AST checks still run because they give the agent actionable errors.
+_SECCOMP_DENIED_SYSCALLS = (
+    'socket', 'socketpair', 'connect', 'bind', 'listen', 'accept', 'accept4',
+    'ptrace', 'process_vm_readv', 'process_vm_writev',
+    'mount', 'umount2', 'pivot_root', 'chroot', 'unshare', 'setns',
+    'bpf', 'perf_event_open', 'userfaultfd', 'keyctl', 'add_key', 'request_key',
+    'init_module', 'finit_module', 'delete_module', 'kexec_load', 'reboot',
+    'swapon', 'swapoff',
+)
+
+# Opt-in cgroup v2 limits: HELIO_CGROUP names a delegated cgroup whose
+# cgroup.subtree_control enables the memory and cpu controllers. Each cold
+# execution then runs in its own child cgroup, which charges resident memory
+# instead of the address space that RLIMIT_AS charges for numpy/BLAS mappings.
+CGROUP_ENV_VAR = "HELIO_CGROUP"
+CGROUP_MEMORY_MAX = 512 * 1024 * 1024
+CGROUP_CPU_MAX = "100000 100000"  # One full CPU
+
+# Child output is read as bytes and decoded once, with the encoding text=True would use
+OUTPUT_ENCODING = locale.getpreferredencoding(False)
+
+# Scripts are handed to cold interpreters through an in-memory fd where supported (Linux)
+MEMFD_AVAILABLE = hasattr(os, 'memfd_create')
+
+# Preflight verdicts for code that passed all checks are reused for 7 days
+VALIDATION_CACHE_TTL = 7 * 24 * 3600
+# Version of the preflight checker logic (_PreflightVisitor, check_syntax,
+# check_imports, check_dangerous_patterns). Part of the verdict cache key:
+# bump it with any rule change so verdicts from older rules stop matching.
+PREFLIGHT_VERSION = 1
+# Per-user location: a cache hit skips the security checks, so verdicts must
+# never live in a directory another user can write to (e.g. under /tmp)
+VALIDATION_CACHE_DIR = Path.home() / ".cache" / "helio" / "validation_cache"
+
+# Bootstrap for pre-warmed interpreters: heavy libraries are imported up front,
+# then the process reports readiness with a blank line and blocks until it is
+# handed the path of one script to run.
+# Each interpreter runs a single script, so executions stay isolated.
+_WARM_BOOTSTRAP = """
+import sys
+for _mod in ('numpy', 'pandas', 'scipy', 'pvlib'):
+    try:
+        __import__(_mod)
+    except ImportError:
+        pass
+sys.stdout.write('\\n')
+sys.stdout.flush()
+_path = sys.stdin.readline().strip()
+if not _path:
+    sys.exit(0)
+with open(_path, encoding='utf-8') as _f:
+    _code = compile(_f.read(), _path, 'exec')
+sys.argv = [_path]
+try:
+    exec(_code, {'__name__': '__main__', '__file__': _path, '__builtins__': __builtins__})
+except SystemExit:
+    raise
+except BaseException as _e:
+    import traceback
+    traceback.print_exception(type(_e), _e, _e.__traceback__.tb_next)
+    sys.exit(1)
+"""
+
+# Determinism wrapper prepended to user code; the numpy check is done in Python
+# so the user code is emitted once, verbatim, after the prefix.
+_DETERMINISM_PREFIX = '''
+# === Determinism Wrapper (Phase 1 Security Hardening) ===
+import random
+import time as _time_module
+import datetime as _datetime_module
+
+# Seed random for reproducibility
+random.seed({seed})
+
+# Seed numpy.random if the user code uses numpy
+_has_numpy = {has_numpy}
+if _has_numpy:
+    try:
+        import numpy as np
+        np.random.seed({seed})
+    except:
+        pass
+
+# Mock time.time() to return fixed value
+_original_time = _time_module.time
+_time_module.time = lambda: {fixed_timestamp}
+
+# Mock datetime.now() by replacing at module level
+_original_datetime_class = _datetime_module.datetime
+_fixed_datetime = _original_datetime_class.fromtimestamp({fixed_timestamp})
+
+class _DeterministicDatetime(_original_datetime_class):
+    @classmethod
+    def now(cls, tz=None):
+        if tz is None:
+            return _fixed_datetime
+        return _fixed_datetime.replace(tzinfo=tz)
+
+_datetime_module.datetime = _DeterministicDatetime
+
+# === User Code Below ===
+'''
+
+# Error categories in priority order: the first category with a token present
+# in the (lowercased) stderr wins. Plain substring search is kept on purpose;
+# a single alternation regex is ~70x slower on a 1 MB stderr.
+_ERROR_CATEGORIES = (
+    (("timeout", "timed out"), "timeout"),
+    (("modulenotfounderror", "importerror"), "import_error"),
+    (("keyerror",), "key_error"),
+    (("attributeerror",), "attribute_error"),
+    (("valueerror",), "value_error"),
+    (("typeerror",), "type_error"),
+    (("nameerror",), "name_error"),
+    (("zerodivisionerror",), "zero_division"),
+    (("indexerror",), "index_error"),
+    (("unexpected keyword",), "api_parameter_error"),
+)
+
+
+@lru_cache(maxsize=32)
+def _parse_code(code: str) -> ast.Module:
+    """Parse code once; the syntax, import and security checks share the tree (read-only)."""
+    # compile() with PyCF_ONLY_AST is what ast.parse wraps, minus its Python-level frame
+    return compile(code, '<agent>', 'exec', ast.PyCF_ONLY_AST, dont_inherit=True)
+
+
+class _PreflightVisitor(ast.NodeVisitor):
+    """
+    Single traversal collecting forbidden imports and security violations.
+
+    Violations are recorded as the final error strings. Nodes are visited in
+    ast.walk (breadth-first) order, the order the separate per-check walks
+    used, so the first violation reported for code with several is unchanged.
+    """
+
+    def __init__(self, executor: "PythonExecutor"):
+        self.allowed_imports = executor.ALLOWED_IMPORTS
+        self.safe_dunders = executor.SAFE_DUNDERS
+        self.forbidden_functions = executor.FORBIDDEN_FUNCTIONS
+        self.forbidden_attr_functions = executor.FORBIDDEN_ATTR_FUNCTIONS
+        self.forbidden_imports: List[str] = []
+        self.violations: List[str] = []
+
+    def visit(self, tree: ast.AST):
+        # Flat breadth-first dispatch instead of NodeVisitor's depth-first recursion
+        for node in ast.walk(tree):
+            visitor = getattr(self, 'visit_' + node.__class__.__name__, None)
+            if visitor is not None:
+                visitor(node)
+
+    def visit_Import(self, node: ast.Import):
+        for alias in node.names:
+            if alias.name.split('.')[0] not in self.allowed_imports:
+                self.forbidden_imports.append(alias.name)
+
+    def visit_ImportFrom(self, node: ast.ImportFrom):
+        if node.module and node.module.split('.')[0] not in self.allowed_imports:
+            self.forbidden_imports.append(node.module)
+
+    def visit_Call(self, node: ast.Call):
+        func = node.func
+        if isinstance(func, ast.Name):
+            if func.id in self.forbidden_functions:
+                self.violations.append(f"SECURITY: Forbidden function: {func.id}()")
+
+            # Check getattr/setattr with dunder attribute names
+            elif func.id in self.forbidden_attr_functions and len(node.args) >= 2:
+                attr_arg = node.args[1]
+                if isinstance(attr_arg, ast.Constant) and isinstance(attr_arg.value, str):
+                    if attr_arg.value[:2] == '__':
+                        self.violations.append(
+                            f"SECURITY: Forbidden: {func.id}() with dunder attribute '{attr_arg.value}'")
+
+    def visit_Name(self, node: ast.Name):
+        # Block direct reference to dangerous dunder names (e.g., __builtins__)
+        name = node.id
+        if name[:2] == '__' == name[-2:] and name not in self.safe_dunders:
+            self.violations.append(f"SECURITY: Forbidden name reference: {name}")
+
+    def visit_Attribute(self, node: ast.Attribute):
+        # Block access to dunder attributes (except safe ones)
+        attr = node.attr
+        if attr[:2] == '__' == attr[-2:] and attr not in self.safe_dunders:
+            self.violations.append(f"SECURITY: Forbidden attribute access: {attr}")
+
 
 class PythonExecutor:
     # Allowed imports for PV simulation (security + reliability)
-    ALLOWED_IMPORTS = {
+    ALLOWED_IMPORTS = frozenset({
         'pvlib', 'pandas', 'numpy', 'scipy', 'matplotlib', 'json',
         'math', 'datetime', 'pytz', 'dateutil', 'warnings',
         'random', 'time'  # Safe for simulations, used in determinism wrapper
-    }
+    })
 
     # Safe dunder attributes that are allowed
-    SAFE_DUNDERS = {'__name__', '__doc__', '__version__', '__file__'}
+    SAFE_DUNDERS = frozenset({'__name__', '__doc__', '__version__', '__file__'})
 
     # Forbidden functions that enable escape or introspection
-    FORBIDDEN_FUNCTIONS = {
+    FORBIDDEN_FUNCTIONS = frozenset({
         'eval', 'exec', 'compile', '__import__',
         'vars', 'globals', 'locals', 'dir', 'open',
         'input', 'breakpoint', 'help', 'copyright', 'credits', 'license'
-    }
+    })
 
     # Forbidden attribute access functions
-    FORBIDDEN_ATTR_FUNCTIONS = {'getattr', 'setattr', 'delattr', 'hasattr'}
+    FORBIDDEN_ATTR_FUNCTIONS = frozenset({'getattr', 'setattr', 'delattr', 'hasattr'})
 
-    def __init__(self, venv_path: str = None, logger=None, enable_hardening: bool = True):
+    def __init__(self, venv_path: str = None, logger=None, enable_hardening: bool = True,
+                 warm_interpreters: int = 0):
         """
         Args:
             venv_path: Path to Python venv with pvlib installed.
                       If None, uses system Python (not recommended).
             logger: Optional StructuredLogger for observability
             enable_hardening: Enable Phase 1 security hardening (default: True)
+            warm_interpreters: Number of spare interpreters kept ready with
+                      pvlib/numpy/pandas/scipy pre-imported (default: 0, disabled)
         """
         self.venv_path = Path(venv_path) if venv_path else None
         self.logger = logger
         self.enable_hardening = enable_hardening
+        self.warm_interpreters = warm_interpreters
+        self._warm_pool: List[subprocess.Popen] = []
+        self._warm_lock = threading.Lock()
+        # Debug artifacts are written off the request path
+        self._artifact_executor = ThreadPoolExecutor(max_workers=1)
         self.temp_dir = Path(tempfile.gettempdir()) / "sun-sleuth-code"
         self.temp_dir.mkdir(exist_ok=True)
+        self.validation_cache_dir = VALIDATION_CACHE_DIR
+        # Verdicts are only valid for the checker version and policy that produced them
+        policy = repr((PREFLIGHT_VERSION, sorted(self.ALLOWED_IMPORTS), sorted(self.SAFE_DUNDERS),
+                       sorted(self.FORBIDDEN_FUNCTIONS), sorted(self.FORBIDDEN_ATTR_FUNCTIONS),
+                       enable_hardening))
+        self._policy_tag = hashlib.sha256(policy.encode()).hexdigest()[:8]
+        self._last_scan: Optional[Tuple[str, _PreflightVisitor]] = None
+        self.cgroup_parent = self._detect_cgroup_parent() if enable_hardening else None
+        # Built once in the parent; forked children only load it
+        self._seccomp_filter = self._build_seccomp_filter() if enable_hardening else None
 
         if self.venv_path:
             # Determine Python executable path (cross-platform)
@@ -101,7 +326,7 @@ class PythonExecutor:
             None if valid, error message if invalid
         """
         try:
-            ast.parse(code)
+            _parse_code(code)
             return None
         except SyntaxError as e:
             return f"Syntax error at line {e.lineno}, column {e.offset}: {e.msg}"
@@ -116,20 +341,7 @@ class PythonExecutor:
             None if all imports allowed, error message if forbidden imports found
         """
         try:
-            tree = ast.parse(code)
-            forbidden = []
-
-            for node in ast.walk(tree):
-                if isinstance(node, ast.Import):
-                    for alias in node.names:
-                        base_module = alias.name.split('.')[0]
-                        if base_module not in self.ALLOWED_IMPORTS:
-                            forbidden.append(alias.name)
-                elif isinstance(node, ast.ImportFrom):
-                    if node.module:
-                        base_module = node.module.split('.')[0]
-                        if base_module not in self.ALLOWED_IMPORTS:
-                            forbidden.append(node.module)
+            forbidden = self._scan(code).forbidden_imports
 
             if forbidden:
                 return (f"Forbidden imports detected: {', '.join(forbidden)}. "
@@ -138,6 +350,78 @@ class PythonExecutor:
         except Exception as e:
             return f"Import validation error: {str(e)}"
 
+    def _scan(self, code: str) -> _PreflightVisitor:
+        """Run the single-pass preflight visitor, reusing the last result for the same code."""
+        last_scan = self._last_scan
+        if last_scan is not None and last_scan[0] == code:
+            return last_scan[1]
+        visitor = _PreflightVisitor(self)
+        visitor.visit(_parse_code(code))
+        self._last_scan = (code, visitor)
+        return visitor
+
+    @staticmethod
+    def _save_artifact(code_file: Path, code: str):
+        """Publish a code artifact atomically so readers never see a partial file."""
+        tmp_file = code_file.with_suffix(f".{threading.get_ident()}.tmp")
+        try:
+            tmp_file.write_text(code, encoding='utf-8')
+            os.replace(tmp_file, code_file)
+        except OSError:
+            pass
+
+    def _validation_cache_file(self, code_digest: str) -> Path:
+        """Verdict file for a full SHA-256 code digest under the current policy."""
+        return self.validation_cache_dir / f"{code_digest}-{self._policy_tag}.json"
+
+    def _validation_cache_trusted(self) -> bool:
+        """
+        True if only the current user can add or rename entries in the cache directory.
+
+        Owning a verdict file is not enough: in a directory others can write to, a
+        verdict we wrote for benign code could be renamed onto another code digest.
+        """
+        if not hasattr(os, 'getuid'):
+            return True  # No POSIX ownership model (Windows): per-user profile directory
+        try:
+            st = os.lstat(self.validation_cache_dir)
+        except OSError:
+            return False
+        return (stat.S_ISDIR(st.st_mode)
+                and st.st_uid == os.getuid()
+                and stat.S_IMODE(st.st_mode) & 0o022 == 0)
+
+    def _is_prevalidated(self, code_digest: str) -> bool:
+        """
+        True if this exact code already passed all preflight checks recently.
+
+        Verdicts are only trusted from a cache directory no other user can write
+        to, and only if the verdict file is owned by the current user.
+        """
+        if not self._validation_cache_trusted():
+            return False
+        try:
+            st = os.stat(self._validation_cache_file(code_digest))
+        except OSError:
+            return False
+        if hasattr(os, 'getuid') and st.st_uid != os.getuid():
+            return False
+        return time.time() - st.st_mtime < VALIDATION_CACHE_TTL
+
+    def _record_validated(self, code_digest: str):
+        """Persist a passing preflight verdict (best effort)."""
+        cache_file = self._validation_cache_file(code_digest)
+        tmp_file = cache_file.with_suffix(f".{os.getpid()}.tmp")
+        try:
+            self.validation_cache_dir.mkdir(mode=0o700, parents=True, exist_ok=True)
+            if not self._validation_cache_trusted():
+                return  # Pre-existing directory we don't exclusively control: cache disabled
+            tmp_file.write_text(json.dumps({"syntax_ok": True, "imports_ok": True, "security_ok": True}),
+                                encoding='utf-8')
+            os.replace(tmp_file, cache_file)
+        except OSError:
+            pass
+
     def wrap_with_determinism(self, code: str, seed: int = 42, fixed_timestamp: float = 1704067200.0) -> str:
         """
         Wrap user code with determinism helpers (Phase 1 Hardening).
@@ -156,48 +440,9 @@ class PythonExecutor:
         Returns:
             Wrapped code string
         """
-        # Escape quotes in user code for string embedding
-        code_escaped = code.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
-
-        wrapper = f'''
-# === Determinism Wrapper (Phase 1 Security Hardening) ===
-import random
-import time as _time_module
-import datetime as _datetime_module
-
-# Seed random for reproducibility
-random.seed({seed})
-
-# Try to seed numpy.random if it will be imported (check code content)
-_has_numpy = 'numpy' in """{code_escaped}""" or 'np.' in """{code_escaped}"""
-if _has_numpy:
-    try:
-        import numpy as np
-        np.random.seed({seed})
-    except:
-        pass
-
-# Mock time.time() to return fixed value
-_original_time = _time_module.time
-_time_module.time = lambda: {fixed_timestamp}
-
-# Mock datetime.now() by replacing at module level
-_original_datetime_class = _datetime_module.datetime
-_fixed_datetime = _original_datetime_class.fromtimestamp({fixed_timestamp})
-
-class _DeterministicDatetime(_original_datetime_class):
-    @classmethod
-    def now(cls, tz=None):
-        if tz is None:
-            return _fixed_datetime
-        return _fixed_datetime.replace(tzinfo=tz)
-
-_datetime_module.datetime = _DeterministicDatetime
-
-# === User Code Below ===
-{code}
-'''
-        return wrapper
+        has_numpy = 'numpy' in code or 'np.' in code
+        prefix = _DETERMINISM_PREFIX.format(seed=seed, fixed_timestamp=fixed_timestamp, has_numpy=has_numpy)
+        return prefix + code + '\n'
 
     def check_dangerous_patterns(self, code: str) -> Optional[str]:
         """
@@ -217,50 +462,38 @@ _datetime_module.datetime = _DeterministicDatetime
             return None
 
         try:
-            tree = ast.parse(code)
-
-            for node in ast.walk(tree):
-                # Block forbidden function calls
-                if isinstance(node, ast.Call):
-                    if isinstance(node.func, ast.Name):
-                        if node.func.id in self.FORBIDDEN_FUNCTIONS:
-                            return f"SECURITY: Forbidden function: {node.func.id}()"
-
-                        # Check getattr/setattr with dunder attribute names
-                        if node.func.id in self.FORBIDDEN_ATTR_FUNCTIONS:
-                            if len(node.args) >= 2:
-                                attr_arg = node.args[1]
-                                if isinstance(attr_arg, ast.Constant):
-                                    if isinstance(attr_arg.value, str):
-                                        if attr_arg.value.startswith('__'):
-                                            return f"SECURITY: Forbidden: {node.func.id}() with dunder attribute '{attr_arg.value}'"
-
-                # Block direct reference to dangerous dunder names (e.g., __builtins__)
-                if isinstance(node, ast.Name):
-                    if node.id.startswith('__') and node.id.endswith('__'):
-                        if node.id not in self.SAFE_DUNDERS:
-                            return f"SECURITY: Forbidden name reference: {node.id}"
-
-                # Block access to dunder attributes (except safe ones)
-                if isinstance(node, ast.Attribute):
-                    if node.attr.startswith('__') and node.attr.endswith('__'):
-                        if node.attr not in self.SAFE_DUNDERS:
-                            return f"SECURITY: Forbidden attribute access: {node.attr}"
-
-            return None
+            violations = self._scan(code).violations
+            return violations[0] if violations else None
         except Exception as e:
             return f"Security pattern validation error: {str(e)}"
 
-    def _apply_resource_limits(self):
+    @staticmethod
+    def _build_seccomp_filter():
+        """Build the syscall denylist filter, or None if seccomp is unavailable."""
+        if not SECCOMP_AVAILABLE:
+            return None
+        try:
+            syscall_filter = seccomp.SyscallFilter(defaction=seccomp.ALLOW)
+        except Exception:
+            return None
+        for syscall in _SECCOMP_DENIED_SYSCALLS:
+            try:
+                syscall_filter.add_rule(seccomp.ERRNO(errno.EPERM), syscall)
+            except Exception:
+                pass  # Syscall not defined on this architecture
+        return syscall_filter
+
+    def _apply_resource_limits(self, limit_address_space: bool = True):
         """
         Apply resource limits before executing code (Phase 1 Hardening).
         Only works on Unix-like systems.
 
         Limits:
         - CPU time: 30 seconds
-        - Memory: 512 MB
+        - Memory: 512 MB (address space; skipped when a cgroup limits memory)
         - File size: 10 MB
         - Max processes: 1 (prevent fork bombs)
+        - Seccomp syscall denylist (if pyseccomp is installed)
         """
         if not RESOURCE_AVAILABLE or not self.enable_hardening:
             return
@@ -269,7 +502,8 @@ _datetime_module.datetime = _DeterministicDatetime
         resource.setrlimit(resource.RLIMIT_CPU, (30, 30))
 
         # Memory limit: 512 MB
-        resource.setrlimit(resource.RLIMIT_AS, (512 * 1024 * 1024, 512 * 1024 * 1024))
+        if limit_address_space:
+            resource.setrlimit(resource.RLIMIT_AS, (512 * 1024 * 1024, 512 * 1024 * 1024))
 
         # File size limit: 10 MB
         resource.setrlimit(resource.RLIMIT_FSIZE, (10 * 1024 * 1024, 10 * 1024 * 1024))
@@ -277,6 +511,189 @@ _datetime_module.datetime = _DeterministicDatetime
         # Max 1 process (prevent fork bombs)
         resource.setrlimit(resource.RLIMIT_NPROC, (1, 1))
 
+        # Deny network/introspection syscalls (inherited across exec)
+        if self._seccomp_filter is not None:
+            self._seccomp_filter.load()
+
+    def _preexec_fn(self, cgroup: Optional[Path] = None):
+        if not RESOURCE_AVAILABLE or os.name == 'nt':
+            return None
+        if cgroup is None:
+            return self._apply_resource_limits
+
+        procs_file = str(cgroup / "cgroup.procs")
+
+        def join_cgroup_and_limit():
+            # Writing 0 moves the calling (child) process; the cgroup enforces memory
+            fd = os.open(procs_file, os.O_WRONLY)
+            try:
+                os.write(fd, b"0")
+            finally:
+                os.close(fd)
+            self._apply_resource_limits(limit_address_space=False)
+
+        return join_cgroup_and_limit
+
+    @staticmethod
+    def _detect_cgroup_parent() -> Optional[Path]:
+        """Return the delegated cgroup v2 named by HELIO_CGROUP, if usable."""
+        path = os.environ.get(CGROUP_ENV_VAR)
+        if not path or os.name == 'nt':
+            return None
+        parent = Path(path)
+        try:
+            controllers = set((parent / "cgroup.subtree_control").read_text().split())
+        except OSError:
+            return None
+        if not {"memory", "cpu"} <= controllers or not os.access(parent, os.W_OK):
+            return None
+        return parent
+
+    def _create_cgroup(self) -> Optional[Path]:
+        """Create a per-execution child cgroup with memory/CPU limits (None if unavailable)."""
+        if self.cgroup_parent is None:
+            return None
+        cgroup = self.cgroup_parent / f"exec-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        try:
+            cgroup.mkdir()
+            (cgroup / "memory.max").write_text(str(CGROUP_MEMORY_MAX))
+            (cgroup / "cpu.max").write_text(CGROUP_CPU_MAX)
+        except OSError:
+            self._remove_cgroup(cgroup)
+            return None
+        return cgroup
+
+    @staticmethod
+    def _remove_cgroup(cgroup: Path):
+        try:
+            cgroup.rmdir()
+        except OSError:
+            pass
+
+    @staticmethod
+    def _cgroup_oom_killed(cgroup: Path) -> bool:
+        try:
+            for line in (cgroup / "memory.events").read_text().splitlines():
+                key, _, value = line.partition(' ')
+                if key == "oom_kill":
+                    return int(value) > 0
+        except (OSError, ValueError):
+            pass
+        return False
+
+    def _spawn_warm_interpreter(self) -> subprocess.Popen:
+        """Start an interpreter that pre-imports the PV stack and waits for a script path."""
+        return subprocess.Popen(
+            [str(self.python_exe), "-c", _WARM_BOOTSTRAP],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            cwd=os.getcwd(),
+            preexec_fn=self._preexec_fn()
+        )
+
+    def _acquire_warm_interpreter(self) -> Optional[subprocess.Popen]:
+        """
+        Take a spare interpreter that has finished its imports, and top the pool back up.
+
+        Spares are single-use, so a replacement starts importing in the
+        background while the current script runs. Returns None (cold start)
+        when no spare is ready yet, so import time never counts against the
+        script's timeout.
+        """
+        if self.warm_interpreters <= 0 or os.name == 'nt':
+            return None
+        with self._warm_lock:
+            return self._take_warm_interpreter()
+
+    def _take_warm_interpreter(self) -> Optional[subprocess.Popen]:
+        self._warm_pool = [p for p in self._warm_pool if p.poll() is None]
+        ready = None
+        if self._warm_pool:
+            readable, _, _ = select.select([p.stdout for p in self._warm_pool], [], [], 0)
+            for proc in self._warm_pool:
+                if proc.stdout in readable:
+                    ready = proc
+                    break
+        if ready is not None:
+            self._warm_pool.remove(ready)
+            os.read(ready.stdout.fileno(), 1)  # consume the readiness newline
+        while len(self._warm_pool) < self.warm_interpreters:
+            self._warm_pool.append(self._spawn_warm_interpreter())
+        return ready
+
+    def close(self):
+        """Terminate any spare interpreters."""
+        with self._warm_lock:
+            for proc in self._warm_pool:
+                proc.kill()
+                proc.wait()
+            self._warm_pool = []
+
+    def _communicate_capped(self, proc: subprocess.Popen, timeout: int,
+                            max_output_bytes: Optional[int]) -> Tuple[bytes, bytes, bool]:
+        """
+        Wait for proc while reading at most max_output_bytes from each pipe.
+
+        Once either pipe exceeds the limit the child is killed, so a runaway
+        print costs O(max_output_bytes) memory instead of buffering everything.
+
+        Returns:
+            (stdout bytes, stderr bytes, output_exceeded)
+
+        Raises:
+            subprocess.TimeoutExpired: after killing the child
+        """
+        if os.name == 'nt':
+            # Windows pipes cannot be multiplexed with selectors
+            try:
+                stdout, stderr = proc.communicate(timeout=timeout)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+                proc.communicate()
+                raise
+            exceeded = max_output_bytes is not None and max(len(stdout), len(stderr)) > max_output_bytes
+            if exceeded:
+                stdout, stderr = stdout[:max_output_bytes], stderr[:max_output_bytes]
+            return stdout, stderr, exceeded
+
+        buffers = {proc.stdout: bytearray(), proc.stderr: bytearray()}
+        exceeded = False
+        deadline = time.monotonic() + timeout
+        # The pipes are closed on every exit, including the timeout raised mid-read
+        try:
+            with selectors.DefaultSelector() as selector:
+                for pipe in buffers:
+                    selector.register(pipe, selectors.EVENT_READ)
+                while selector.get_map() and not exceeded:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        proc.kill()
+                        proc.wait()
+                        raise subprocess.TimeoutExpired(proc.args, timeout)
+                    for key, _ in selector.select(remaining):
+                        chunk = os.read(key.fd, 65536)
+                        if not chunk:
+                            selector.unregister(key.fileobj)
+                            continue
+                        buf = buffers[key.fileobj]
+                        buf += chunk
+                        if max_output_bytes is not None and len(buf) > max_output_bytes:
+                            del buf[max_output_bytes:]
+                            exceeded = True
+                            proc.kill()
+                            break
+
+            proc.wait(timeout=max(deadline - time.monotonic(), 0))
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.wait()
+            raise
+        finally:
+            proc.stdout.close()
+            proc.stderr.close()
+        return bytes(buffers[proc.stdout]), bytes(buffers[proc.stderr]), exceeded
+
     def execute(
         self,
         code: str,
@@ -296,33 +713,51 @@ _datetime_module.datetime = _DeterministicDatetime
         Returns:
             (success: bool, stdout: str, stderr: str)
         """
-        # Write code to temporary file with UTF-8 encoding
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.py', delete=False, encoding='utf-8') as f:
-            f.write(code)
-            temp_file = f.name
+        script_fd = None
+        temp_file = None
+        cgroup = None
 
         try:
-            # Run code in subprocess with resource limits
-            result = subprocess.run(
-                [str(self.python_exe), temp_file],
-                capture_output=True,
-                text=True,
-                timeout=timeout,
-                cwd=os.getcwd(),
-                preexec_fn=self._apply_resource_limits if RESOURCE_AVAILABLE and os.name != 'nt' else None
-            )
-
-            success = result.returncode == 0
-            stdout = result.stdout if capture_stdout else ""
-            stderr = result.stderr
+            proc = self._acquire_warm_interpreter()
+            if proc is None and MEMFD_AVAILABLE:
+                # Anonymous in-memory script (Linux): no filesystem round trip, nothing to unlink
+                script_fd = os.memfd_create("agent_code")
+                with open(script_fd, 'wb', closefd=False) as f:
+                    f.write(code.encode('utf-8'))
+                script_path = f"/proc/self/fd/{script_fd}"
+            else:
+                # Write code to temporary file with UTF-8 encoding
+                with tempfile.NamedTemporaryFile(mode='w', suffix='.py', delete=False, encoding='utf-8') as f:
+                    f.write(code)
+                    script_path = temp_file = f.name
+
+            if proc is not None:
+                proc.stdin.write(script_path.encode('utf-8') + b"\n")
+                proc.stdin.close()
+            else:
+                # Run code in subprocess with resource limits
+                cgroup = self._create_cgroup()
+                proc = subprocess.Popen(
+                    [str(self.python_exe), script_path],
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.PIPE,
+                    cwd=os.getcwd(),
+                    pass_fds=(script_fd,) if script_fd is not None else (),
+                    preexec_fn=self._preexec_fn(cgroup)
+                )
 
-            # Apply output size limits (Phase 1 Hardening)
-            if self.enable_hardening and len(stdout) > max_output_bytes:
-                stdout = stdout[:max_output_bytes]
-                stderr += f"\n[SECURITY] Output truncated (exceeded {max_output_bytes} bytes limit)"
+            # Apply output size limits while reading (Phase 1 Hardening)
+            stdout_bytes, stderr_bytes, exceeded = self._communicate_capped(
+                proc, timeout, max_output_bytes if self.enable_hardening else None
+            )
 
-            if self.enable_hardening and len(stderr) > max_output_bytes:
-                stderr = stderr[:max_output_bytes]
+            success = proc.returncode == 0 and not exceeded
+            stdout = stdout_bytes.decode(OUTPUT_ENCODING, 'replace') if capture_stdout else ""
+            stderr = stderr_bytes.decode(OUTPUT_ENCODING, 'replace')
+            if cgroup is not None and proc.returncode != 0 and self._cgroup_oom_killed(cgroup):
+                stderr += f"\nMemoryError: exceeded {CGROUP_MEMORY_MAX // (1024 * 1024)} MB memory limit (cgroup)"
+            if exceeded:
+                stderr += f"\n[SECURITY] Output truncated (exceeded {max_output_bytes} bytes limit), process terminated"
 
             return success, stdout, stderr
 
@@ -331,11 +766,16 @@ _datetime_module.datetime = _DeterministicDatetime
         except Exception as e:
             return False, "", f"Execution error: {str(e)}"
         finally:
-            # Clean up temp file
-            try:
-                os.unlink(temp_file)
-            except:
-                pass
+            if cgroup is not None:
+                self._remove_cgroup(cgroup)
+            # Clean up script
+            if script_fd is not None:
+                os.close(script_fd)
+            if temp_file is not None:
+                try:
+                    os.unlink(temp_file)
+                except:
+                    pass
 
     def execute_with_json_output(self, code: str, timeout: int = 60, enforce_determinism: bool = False) -> Dict:
         """
@@ -357,14 +797,20 @@ _datetime_module.datetime = _DeterministicDatetime
         """
         start_time = time.time()
 
-        # Apply determinism wrapper if requested
-        if enforce_determinism and self.enable_hardening:
-            code = self.wrap_with_determinism(code)
-
-        # Save code artifact for debugging
-        code_hash = hashlib.sha256(code.encode()).hexdigest()[:8]
-        code_file = self.temp_dir / f"code_{code_hash}.py"
-        code_file.write_text(code, encoding='utf-8')
+        # Preflight checks validate the user code only; the determinism wrapper
+        # is known-safe and is prepended just for execution
+        wrapped = enforce_determinism and self.enable_hardening
+        exec_code = self.wrap_with_determinism(code) if wrapped else code
+
+        # Save code artifact for debugging (as executed, so traceback line numbers match)
+        # One digest serves both the artifact name and the validation cache key.
+        # The cache lets code skip the security checks, so the key must stay
+        # collision resistant; SHA-256 is also hardware accelerated (SHA-NI/ARMv8)
+        # and measured ~2x faster than BLAKE2b on 50 KB scripts.
+        code_digest = hashlib.sha256(code.encode()).hexdigest()
+        code_hash = code_digest[:8]
+        code_file = self.temp_dir / f"code_{code_hash}{'_det' if wrapped else ''}.py"
+        self._artifact_executor.submit(self._save_artifact, code_file, exec_code)
 
         # Log tool call start
         if self.logger:
@@ -375,13 +821,15 @@ _datetime_module.datetime = _DeterministicDatetime
                 data={
                     "code_ref": str(code_file),
                     "code_hash": code_hash,
-                    "code_lines": len(code.split('\n')),
+                    "code_lines": len(exec_code.split('\n')),
                     "timeout": timeout
                 }
             )
 
-        # Preflight checks
-        syntax_error = self.check_syntax(code)
+        # Preflight checks (skipped for code that already passed them)
+        prevalidated = self._is_prevalidated(code_digest)
+
+        syntax_error = None if prevalidated else self.check_syntax(code)
         if syntax_error:
             error_result = {
                 "success": False,
@@ -400,7 +848,7 @@ _datetime_module.datetime = _DeterministicDatetime
                 )
             return error_result
 
-        import_error = self.check_imports(code)
+        import_error = None if prevalidated else self.check_imports(code)
         if import_error:
             error_result = {
                 "success": False,
@@ -420,7 +868,7 @@ _datetime_module.datetime = _DeterministicDatetime
             return error_result
 
         # Security pattern checks (Phase 1 Hardening)
-        if self.enable_hardening:
+        if self.enable_hardening and not prevalidated:
             security_error = self.check_dangerous_patterns(code)
             if security_error:
                 error_result = {
@@ -440,8 +888,11 @@ _datetime_module.datetime = _DeterministicDatetime
                     )
                 return error_result
 
+        if not prevalidated:
+            self._record_validated(code_digest)
+
         # Execute code
-        success, stdout, stderr = self.execute(code, timeout)
+        success, stdout, stderr = self.execute(exec_code, timeout)
         duration_ms = (time.time() - start_time) * 1000
 
         if not success:
@@ -472,29 +923,27 @@ _datetime_module.datetime = _DeterministicDatetime
 
         # Try to parse last line as JSON
         try:
-            lines = stdout.strip().split('\n')
             # Look for JSON in output (usually last line)
-            for line in reversed(lines):
-                line = line.strip()
-                if line.startswith('{') or line.startswith('['):
-                    parsed = json.loads(line)
-                    result = {
-                        "success": True,
-                        "output": parsed,
-                        "error": None,
-                        "raw_stdout": stdout
-                    }
-
-                    if self.logger:
-                        self.logger.log_tool_call(
-                            tool="python",
-                            input_data={"code_hash": code_hash},
-                            result=result,
-                            error_type=None,
-                            duration_ms=duration_ms
-                        )
-
-                    return result
+            line = self._last_json_line(stdout)
+            if line is not None:
+                parsed = json.loads(line)
+                result = {
+                    "success": True,
+                    "output": parsed,
+                    "error": None,
+                    "raw_stdout": stdout
+                }
+
+                if self.logger:
+                    self.logger.log_tool_call(
+                        tool="python",
+                        input_data={"code_hash": code_hash},
+                        result=result,
+                        error_type=None,
+                        duration_ms=duration_ms
+                    )
+
+                return result
 
             # No JSON found, return raw stdout
             result = {
@@ -532,6 +981,53 @@ _datetime_module.datetime = _DeterministicDatetime
 
             return result
 
+    @staticmethod
+    def _last_json_line(stdout: str) -> Optional[str]:
+        """
+        Last stdout line that looks like JSON (starts with '{' or '[').
+
+        Scans backwards from the end, so the common case (JSON on the last
+        line) touches only the tail instead of splitting all of stdout.
+        """
+        end = len(stdout)
+        while end > 0:
+            start = stdout.rfind('\n', 0, end) + 1
+            line = stdout[start:end].strip()
+            if line[:1] in ('{', '['):
+                return line
+            end = start - 1
+        return None
+
+    def execute_many(
+        self,
+        codes: List[str],
+        timeout: int = 60,
+        enforce_determinism: bool = False,
+        max_workers: Optional[int] = None
+    ) -> List[Dict]:
+        """
+        Run several scripts concurrently (e.g. sensitivity sweeps).
+
+        Every script still gets its own subprocess; threads only wait on them,
+        so throughput scales with cores while the CPU-bound simulations dominate.
+
+        Args:
+            codes: Python scripts to execute
+            timeout: Per-script execution timeout in seconds
+            enforce_determinism: Wrap each script with determinism helpers
+            max_workers: Concurrent executions (default: CPU count)
+
+        Returns:
+            One execute_with_json_output() result per script, in input order
+        """
+        if not codes:
+            return []
+        workers = min(max_workers or os.cpu_count() or 1, len(codes))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(
+                lambda code: self.execute_with_json_output(code, timeout, enforce_determinism), codes
+            ))
+
     def _categorize_error(self, error_msg: str) -> str:
         """
         Categorize error for pattern detection and analytics.
@@ -544,28 +1040,12 @@ _datetime_module.datetime = _DeterministicDatetime
         """
         error_lower = error_msg.lower()
 
-        if "timeout" in error_lower or "timed out" in error_lower:
-            return "timeout"
-        elif "modulenotfounderror" in error_lower or "importerror" in error_lower:
-            return "import_error"
-        elif "keyerror" in error_lower:
-            return "key_error"
-        elif "attributeerror" in error_lower:
-            return "attribute_error"
-        elif "valueerror" in error_lower:
-            return "value_error"
-        elif "typeerror" in error_lower:
-            return "type_error"
-        elif "nameerror" in error_lower:
-            return "name_error"
-        elif "zerodivisionerror" in error_lower:
-            return "zero_division"
-        elif "indexerror" in error_lower:
-            return "index_error"
-        elif "unexpected keyword" in error_lower or "missing" in error_lower and "argument" in error_lower:
+        for tokens, category in _ERROR_CATEGORIES:
+            if any(token in error_lower for token in tokens):
+                return category
+        if "missing" in error_lower and "argument" in error_lower:
             return "api_parameter_error"
-        else:
-            return "execution_error"
+        return "execution_error"
 
     def test_environment(self) -> bool:
         """Test that Python environment has required dependencies."""
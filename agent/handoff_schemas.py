@@ -1,65 +1,30 @@
-from typing import Literal, List, Optional, Dict, Union, Any
-from pydantic import BaseModel, Field, ConfigDict, field_validator, ValidationError
+from typing import Annotated, Literal, List, Optional, Dict, Union, Any
+from pydantic import BaseModel, Field, ConfigDict, TypeAdapter, field_validator, ValidationError
 
 # --- Base Contract ---
 
 class BaseMessage(BaseModel):
-    """Base class for all agent messages using strict validation."""
+    """Base class for all agent messages using strict validation (immutable once validated)."""
     contract_version: Literal["v1.0"] = "v1.0"
-    model_config = ConfigDict(extra="forbid")
+    model_config = ConfigDict(extra="forbid", frozen=True)
 
 # --- Value Objects & Invariants ---
 
 class PVLocation(BaseMessage):
-    latitude: float = Field(..., description="Latitude in decimal degrees (-90 to 90)")
-    longitude: float = Field(..., description="Longitude in decimal degrees (-180 to 180)")
+    # Range constraints are enforced by pydantic-core, no Python validator callbacks
+    latitude: Annotated[float, Field(ge=-90, le=90, description="Latitude in decimal degrees (-90 to 90)")]
+    longitude: Annotated[float, Field(ge=-180, le=180, description="Longitude in decimal degrees (-180 to 180)")]
     name: Optional[str] = Field(None, description="Human readable name of the location")
 
-    @field_validator("latitude")
-    @classmethod
-    def validate_latitude(cls, v: float) -> float:
-        if not (-90 <= v <= 90):
-            raise ValueError("Latitude must be between -90 and 90")
-        return v
-
-    @field_validator("longitude")
-    @classmethod
-    def validate_longitude(cls, v: float) -> float:
-        if not (-180 <= v <= 180):
-            raise ValueError("Longitude must be between -180 and 180")
-        return v
-
 class PVSpec(BaseMessage):
     """Specification for basic PV system parameters."""
-    system_capacity_kw: float = Field(..., description="DC system capacity in kW")
-    tilt: float = Field(..., description="Panel tilt in degrees (0 horizontal, 90 vertical)")
-    azimuth: float = Field(..., description="Panel azimuth in degrees (0=North, 90=East, 180=South, 270=West)")
+    # Upper bound is a 100 MW sanity limit
+    system_capacity_kw: Annotated[float, Field(gt=0, le=100000, description="DC system capacity in kW")]
+    tilt: Annotated[float, Field(ge=0, le=90, description="Panel tilt in degrees (0 horizontal, 90 vertical)")]
+    azimuth: Annotated[float, Field(ge=0, le=360, description="Panel azimuth in degrees (0=North, 90=East, 180=South, 270=West)")]
     module_type: Literal["standard", "premium", "thin_film"] = "standard"
     array_type: Literal["fixed_open_rack", "roof_mount", "tracker"] = "fixed_open_rack"
 
-    @field_validator("system_capacity_kw")
-    @classmethod
-    def validate_capacity(cls, v: float) -> float:
-        if v <= 0:
-            raise ValueError("System capacity must be positive")
-        if v > 100000: # 100 MW limit for sanity
-             raise ValueError("System capacity unusually large (>100MW), please verify")
-        return v
-
-    @field_validator("tilt")
-    @classmethod
-    def validate_tilt(cls, v: float) -> float:
-        if not (0 <= v <= 90):
-            raise ValueError("Tilt must be between 0 and 90 degrees")
-        return v
-    
-    @field_validator("azimuth")
-    @classmethod
-    def validate_azimuth(cls, v: float) -> float:
-        if not (0 <= v <= 360):
-            raise ValueError("Azimuth must be between 0 and 360")
-        return v
-
 # --- Router Definitions ---
 
 class RouterOutput(BaseMessage):
@@ -99,8 +64,15 @@ class NeedAPIAction(BaseMessage):
     symbols: List[str] = Field(..., description="List of symbols the agent tried to use or needs")
     reason: str = Field(..., description="Why the agent believes it needs this API")
 
-# Discriminated Union for Agent Actions
-AgentAction = Union[PythonAction, FinalAction, ErrorAction, NeedAPIAction]
+# Discriminated Union for Agent Actions: pydantic dispatches on the "action"
+# tag instead of trying each variant in turn
+AgentAction = Annotated[
+    Union[PythonAction, FinalAction, ErrorAction, NeedAPIAction],
+    Field(discriminator="action"),
+]
+
+# Built once at import so each agent step reuses the compiled validator
+AGENT_ACTION_ADAPTER = TypeAdapter(AgentAction)
 
 # --- QA Definitions ---
 
@@ -9,14 +9,76 @@ Responsibilities:
 5. Prevent redundant computations and regressions
 """
 
+import io
 import json
+import os
+import sys
+import threading
 import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from typing import Dict, Any, List, Optional
 from pathlib import Path
-from dataclasses import dataclass, asdict, field
+from types import MappingProxyType
+from dataclasses import dataclass, field
 
+# Optional faster JSON backend for memory persistence
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 
-@dataclass
+
+def _dumps(obj: Any, indent: bool = False) -> str:
+    """Serialize memory data to JSON text (orjson when installed, else stdlib json)."""
+    if ORJSON_AVAILABLE:
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=str, option=option).decode()
+    return json.dumps(obj, indent=2 if indent else None, default=str)
+
+
+def _loads(text: str) -> Any:
+    return orjson.loads(text) if ORJSON_AVAILABLE else json.loads(text)
+
+
+def _write_atomic(path: Path, text: str):
+    """Replace path with fully serialized text in one write; readers never see a partial file."""
+    path = Path(path)
+    tmp_path = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(text.encode())
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
+def _write_json(path: Path, data: Dict[str, Any]):
+    """Write a pre-built snapshot dict as indented JSON (safe to run off-thread)."""
+    _write_atomic(path, _dumps(data, indent=True))
+
+
+# Assumption text keywords -> (recorded parameter, value taken from the PV spec)
+ASSUMPTION_KEYWORDS = (
+    (('location', 'lat'), 'location', lambda spec: f"{spec.site.latitude}, {spec.site.longitude}"),
+    (('clearsky',), 'met_source', lambda spec: 'clearsky'),
+    (('tilt',), 'tilt', lambda spec: spec.system.tilt_deg),
+    (('azimuth',), 'azimuth', lambda spec: spec.system.azimuth_deg),
+)
+
+# Append-only history lists; persisted one JSON line per record next to the header
+TRACE_FIELDS = ('code_versions', 'execution_traces', 'errors', 'diagnoses', 'fixes_attempted')
+
+# Slotted dataclasses (no per-instance __dict__) need Python 3.10+
+_DATACLASS_SLOTS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+
+@dataclass(**_DATACLASS_SLOTS)
 class SimulationMemory:
     """Persistent memory structure for multi-agent collaboration."""
 
@@ -38,6 +100,7 @@ class SimulationMemory:
     errors: List[Dict[str, Any]] = field(default_factory=list)
     diagnoses: List[Dict[str, Any]] = field(default_factory=list)
     fixes_attempted: List[Dict[str, Any]] = field(default_factory=list)
+    previous_fixes: List[List[Dict[str, Any]]] = field(default_factory=list)  # Fixes per diagnosis, fed back to the diagnoser
     error_class_attempts: Dict[str, int] = field(default_factory=dict)  # Phase 3.1: Per-class attempt tracking
 
     # Results
@@ -58,9 +121,11 @@ class SimulationMemory:
         Returns:
             Current attempt count for this error class
         """
-        self.error_class_attempts[error_class] = \
-            self.error_class_attempts.get(error_class, 0) + 1
-        return self.error_class_attempts[error_class]
+        # Interned keys match the (literal, already interned) class names by identity
+        error_class = sys.intern(error_class)
+        attempts = self.error_class_attempts.get(error_class, 0) + 1
+        self.error_class_attempts[error_class] = attempts
+        return attempts
 
     def should_escalate(self, error_class: str, max_attempts: int = 3) -> bool:
         """Check if error class has exceeded retry limit (Phase 3.1).
@@ -74,7 +139,8 @@ class SimulationMemory:
         """
         return self.error_class_attempts.get(error_class, 0) > max_attempts
 
-    def record_assumption(self, parameter: str, assumed_value: Any, rationale: str):
+    def record_assumption(self, parameter: str, assumed_value: Any, rationale: str,
+                          timestamp: Optional[float] = None):
         """Log defaults picked for reproducibility (Phase 3.3).
 
         This method records structured assumptions made during simulation setup,
@@ -84,12 +150,14 @@ class SimulationMemory:
             parameter: Name of parameter with assumption (e.g., 'location', 'met_source')
             assumed_value: Value that was assumed
             rationale: Human-readable explanation for why this default was chosen
+            timestamp: Wall-clock time to record (defaults to now); lets a batch
+                of assumptions made in one phase share a single clock read
         """
         self.recorded_assumptions.append({
             'parameter': parameter,
             'assumed_value': str(assumed_value),
             'rationale': rationale,
-            'timestamp': time.time(),
+            'timestamp': time.time() if timestamp is None else timestamp,
             'fallback_level': self.fallback_level
         })
 
@@ -99,73 +167,136 @@ class SimulationMemory:
         Returns:
             Markdown-formatted reproducibility report
         """
-        report = ["# Simulation Reproducibility Report\n"]
+        # Written straight into one buffer; every line after the title starts with its "\n"
+        buf = io.StringIO()
+        w = buf.write
+        w("# Simulation Reproducibility Report\n")
 
         # Assumptions section
         if self.recorded_assumptions or self.assumptions:
-            report.append("## Assumptions Made\n")
+            w("\n## Assumptions Made\n")
 
-            # Structured assumptions (Phase 3.3)
-            for i, assumption in enumerate(self.recorded_assumptions, 1):
-                report.append(f"{i}. **{assumption['parameter']}** = `{assumption['assumed_value']}`")
-                report.append(f"   - Rationale: {assumption['rationale']}")
-                if assumption.get('fallback_level', 1) > 1:
-                    report.append(f"   - Made at fallback level {assumption['fallback_level']}")
-                report.append("")
+            # Structured assumptions (Phase 3.3): one block per assumption, blank line after each
+            # (record_assumption always sets fallback_level)
+            for i, a in enumerate(self.recorded_assumptions, 1):
+                w(f"\n{i}. **{a['parameter']}** = `{a['assumed_value']}`")
+                w(f"\n   - Rationale: {a['rationale']}")
+                if a['fallback_level'] > 1:
+                    w(f"\n   - Made at fallback level {a['fallback_level']}")
+                w("\n")
 
             # Legacy string assumptions
             if self.assumptions:
-                report.append("\nAdditional assumptions:")
+                w("\n\nAdditional assumptions:")
                 for assumption in self.assumptions:
-                    report.append(f"- {assumption}")
-                report.append("")
+                    w(f"\n- {assumption}")
+                w("\n")
 
         # Error handling section
-        report.append("\n## Error Handling\n")
-        report.append(f"- Total iterations: {self.iteration_count}")
-        report.append(f"- Fallback level: {self.fallback_level}")
+        w("\n\n## Error Handling\n")
+        w(f"\n- Total iterations: {self.iteration_count}")
+        w(f"\n- Fallback level: {self.fallback_level}")
 
         if self.errors:
-            report.append(f"- Errors encountered: {len(self.errors)}")
+            w(f"\n- Errors encountered: {len(self.errors)}")
             for error_class, count in self.error_class_attempts.items():
-                report.append(f"  - {error_class}: {count} attempts")
+                w(f"\n  - {error_class}: {count} attempts")
 
         # Code section
-        report.append("\n## Code Generation\n")
+        w("\n\n## Code Generation\n")
         if self.current_code:
-            report.append(f"- Final code: {len(self.current_code)} bytes")
-            report.append(f"- Code versions generated: {len(self.code_versions)}")
+            w(f"\n- Final code: {len(self.current_code)} bytes")
+            w(f"\n- Code versions generated: {len(self.code_versions)}")
 
         # Execution section
         if self.successful_output:
-            report.append("\n## Execution Summary\n")
-            report.append(f"- Status: Success")
-            report.append(f"- Total execution time: {self.total_execution_time:.2f}s")
+            w("\n\n## Execution Summary\n")
+            w("\n- Status: Success")
+            w(f"\n- Total execution time: {self.total_execution_time:.2f}s")
         elif self.errors:
-            report.append("\n## Execution Summary\n")
-            report.append(f"- Status: Failed after {self.iteration_count} iterations")
+            w("\n\n## Execution Summary\n")
+            w(f"\n- Status: Failed after {self.iteration_count} iterations")
 
-        return "\n".join(report)
+        return buf.getvalue()
 
     def to_dict(self) -> Dict[str, Any]:
-        """Convert memory to dict for serialization."""
-        return asdict(self)
+        """Convert memory to dict for serialization.
+
+        Built field by field with one shallow copy per container: asdict()
+        deep-copies every trace, output and code string on each save.
+        """
+        return {
+            'original_prompt': self.original_prompt,
+            'clarified_prompt': self.clarified_prompt,
+            'pv_spec': dict(self.pv_spec) if self.pv_spec is not None else None,
+            'assumptions': list(self.assumptions),
+            'recorded_assumptions': [dict(a) for a in self.recorded_assumptions],
+            'code_versions': [dict(v) for v in self.code_versions],
+            'current_code': self.current_code,
+            'execution_traces': [dict(t) for t in self.execution_traces],
+            'errors': [dict(e) for e in self.errors],
+            'diagnoses': [dict(d) for d in self.diagnoses],
+            'fixes_attempted': [dict(f) for f in self.fixes_attempted],
+            'previous_fixes': [list(f) for f in self.previous_fixes],
+            'error_class_attempts': dict(self.error_class_attempts),
+            'successful_output': dict(self.successful_output) if self.successful_output is not None else None,
+            'iteration_count': self.iteration_count,
+            'start_time': self.start_time,
+            'total_execution_time': self.total_execution_time,
+            'fallback_level': self.fallback_level,
+        }
 
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'SimulationMemory':
         """Load memory from dict."""
         return cls(**data)
 
+    @staticmethod
+    def trace_path(path: Path) -> Path:
+        """JSONL file holding the history records for the header at path."""
+        path = Path(path)
+        return path.with_name(path.stem + '.trace.jsonl')
+
+    def header_dict(self) -> Dict[str, Any]:
+        """Snapshot of everything except the append-only history lists."""
+        data = self.to_dict()
+        for name in TRACE_FIELDS:
+            del data[name]
+        return data
+
+    def save_header(self, path: Path):
+        """Save everything except the append-only history lists to JSON file."""
+        _write_json(path, self.header_dict())
+
+    @classmethod
+    def append_trace(cls, path: Path, kind: str, record: Dict[str, Any]):
+        """Append one history record (kind is one of TRACE_FIELDS) to the trace log."""
+        with open(cls.trace_path(path), 'a', encoding='utf-8') as f:
+            f.write(_dumps({'kind': kind, 'record': record}) + '\n')
+
     def save(self, path: Path):
-        """Save memory to JSON file."""
-        with open(path, 'w') as f:
-            json.dump(self.to_dict(), f, indent=2)
+        """Save memory to JSON header file plus JSONL trace log."""
+        self.save_header(path)
+        _write_atomic(self.trace_path(path), ''.join(
+            _dumps({'kind': name, 'record': record}) + '\n'
+            for name in TRACE_FIELDS
+            for record in getattr(self, name)
+        ))
 
     @classmethod
     def load(cls, path: Path) -> 'SimulationMemory':
-        """Load memory from JSON file."""
-        with open(path, 'r') as f:
-            data = json.load(f)
+        """Load memory from JSON file (and its trace log, if present)."""
+        with open(path, 'r', encoding='utf-8') as f:
+            data = _loads(f.read())
+        trace_file = cls.trace_path(path)
+        if trace_file.exists():
+            for name in TRACE_FIELDS:
+                data.setdefault(name, [])
+            with open(trace_file, 'r', encoding='utf-8') as f:
+                for line in f:
+                    if line.strip():
+                        entry = _loads(line)
+                        data[entry['kind']].append(entry['record'])
         return cls.from_dict(data)
 
 
@@ -175,7 +306,8 @@ class MemoryCentricOrchestrator:
     MAX_ITERATIONS = 10  # Maximum Plan-Act-Reflect-Revise cycles
 
     # Phase 3.1: Per-error-class attempt limits (from MooseAgent pattern)
-    ERROR_CLASS_MAX_ATTEMPTS = {
+    # Read-only: shared by every orchestrator instance
+    ERROR_CLASS_MAX_ATTEMPTS = MappingProxyType({
         'syntax': 2,        # Syntax errors: try twice, then regenerate
         'import': 1,        # Import errors: try once (switch to clearsky if TMY fails)
         'name_error': 2,    # Undefined variables: try twice, then simplify
@@ -186,7 +318,7 @@ class MemoryCentricOrchestrator:
         'timeout': 2,       # Timeouts: try twice (reduce time range)
         'runtime': 2,       # General runtime errors: try twice
         'unknown': 1        # Unknown errors: try once, then escalate
-    }
+    })
 
     def __init__(
         self,
@@ -211,7 +343,26 @@ class MemoryCentricOrchestrator:
         self.diagnoser = error_diagnosis_agent
         self.logger = logger
 
+        # Bound once: the REFLECT phase looks up a retry limit every failed iteration
+        self._error_limit = self.ERROR_CLASS_MAX_ATTEMPTS.get
+
         self.memory = SimulationMemory()
+        self._memory_path: Optional[Path] = None
+        # Memory headers are written in the background; the snapshot is taken synchronously
+        self._save_executor = ThreadPoolExecutor(max_workers=1)
+        self._pending_save: Optional[Future] = None
+
+    def wait_for_save(self):
+        """Block until the last background memory save has finished (re-raises its error)."""
+        if self._pending_save is not None:
+            pending, self._pending_save = self._pending_save, None
+            pending.result()
+
+    def _record(self, kind: str, record: Dict[str, Any]):
+        """Add a history record to memory and, when persisting, to the trace log."""
+        getattr(self.memory, kind).append(record)
+        if self._memory_path is not None:
+            SimulationMemory.append_trace(self._memory_path, kind, record)
 
     def run_simulation(
         self,
@@ -227,9 +378,30 @@ class MemoryCentricOrchestrator:
         Returns:
             Final result dict with output or error
         """
-        # Initialize memory
+        # Initialize memory; history records are appended to the trace log as they happen
+        self.wait_for_save()
         self.memory = SimulationMemory(original_prompt=user_prompt)
+        self._memory_path = Path(save_memory_path) if save_memory_path else None
+        if self._memory_path is not None:
+            # Header and trace log must describe the same run: drop the previous pair
+            # (header first, so an interrupted reset never leaves an old header with a
+            # new log) and start this run's header before any record is appended
+            self._memory_path.unlink(missing_ok=True)
+            SimulationMemory.trace_path(self._memory_path).unlink(missing_ok=True)
+            self.memory.save_header(self._memory_path)
 
+        try:
+            return self._run_workflow(user_prompt)
+        finally:
+            if self._memory_path is not None:
+                # Final header on every exit path (success, ambiguity, escalation, fatal
+                # error, max iterations); the snapshot is taken now, written off-thread
+                self._pending_save = self._save_executor.submit(
+                    _write_json, self._memory_path, self.memory.header_dict()
+                )
+
+    def _run_workflow(self, user_prompt: str) -> Dict[str, Any]:
+        """Plan-Act-Reflect-Revise workflow behind run_simulation (memory already initialized)."""
         if self.logger:
             self.logger.log_event('simulation_start', prompt=user_prompt)
 
@@ -252,7 +424,8 @@ class MemoryCentricOrchestrator:
             pv_spec, clarification_summary = self.clarifier.clarify(user_prompt)
             self.memory.pv_spec = pv_spec.model_dump() if hasattr(pv_spec, 'model_dump') else dict(pv_spec)
             self.memory.clarified_prompt = clarification_summary
-            self.memory.assumptions = pv_spec.assumptions if hasattr(pv_spec, 'assumptions') else []
+            # Own a copy: escalation appends to memory.assumptions, which must not leak into the spec
+            self.memory.assumptions = list(pv_spec.assumptions) if getattr(pv_spec, 'assumptions', None) else []
 
             # Phase 3.3: Double-check for ambiguity in generated spec
             post_clarification_ambiguity = self.clarifier.detect_ambiguity(user_prompt, pv_spec)
@@ -270,51 +443,19 @@ class MemoryCentricOrchestrator:
 
             # Phase 3.3: Record any assumptions made during clarification
             # (these come from the clarifier's default selection logic)
-            if hasattr(pv_spec, 'assumptions') and pv_spec.assumptions:
-                for assumption_text in pv_spec.assumptions:
-                    # Parse assumption into structured format
-                    # For now, record as-is (could be enhanced with structured parsing)
-                    if 'location' in assumption_text.lower() or 'lat' in assumption_text.lower():
-                        self.memory.record_assumption(
-                            'location',
-                            f"{pv_spec.site.latitude}, {pv_spec.site.longitude}",
-                            assumption_text
-                        )
-                        # Phase 3.5: Log assumption to structured logger
-                        if self.logger:
-                            self.logger.log_assumption(
-                                'location',
-                                f"{pv_spec.site.latitude}, {pv_spec.site.longitude}",
-                                assumption_text,
-                                self.memory.fallback_level
-                            )
-                    elif 'clearsky' in assumption_text.lower():
-                        self.memory.record_assumption(
-                            'met_source',
-                            'clearsky',
-                            assumption_text
-                        )
-                        # Phase 3.5: Log assumption
-                        if self.logger:
-                            self.logger.log_assumption('met_source', 'clearsky', assumption_text, self.memory.fallback_level)
-                    elif 'tilt' in assumption_text.lower():
-                        self.memory.record_assumption(
-                            'tilt',
-                            pv_spec.system.tilt_deg,
-                            assumption_text
-                        )
-                        # Phase 3.5: Log assumption
-                        if self.logger:
-                            self.logger.log_assumption('tilt', pv_spec.system.tilt_deg, assumption_text, self.memory.fallback_level)
-                    elif 'azimuth' in assumption_text.lower():
-                        self.memory.record_assumption(
-                            'azimuth',
-                            pv_spec.system.azimuth_deg,
-                            assumption_text
-                        )
-                        # Phase 3.5: Log assumption
-                        if self.logger:
-                            self.logger.log_assumption('azimuth', pv_spec.system.azimuth_deg, assumption_text, self.memory.fallback_level)
+            if self.memory.assumptions:
+                planned_at = time.time()  # all assumptions belong to the same PLAN phase
+                for assumption_text in self.memory.assumptions:
+                    # Parse assumption into structured format (first keyword match wins)
+                    lowered = assumption_text.lower()
+                    for keywords, parameter, get_value in ASSUMPTION_KEYWORDS:
+                        if any(keyword in lowered for keyword in keywords):
+                            value = get_value(pv_spec)
+                            self.memory.record_assumption(parameter, value, assumption_text, planned_at)
+                            # Phase 3.5: Log assumption to structured logger
+                            if self.logger:
+                                self.logger.log_assumption(parameter, value, assumption_text, self.memory.fallback_level)
+                            break
                     # Could add more structured parsing here
 
             if self.logger:
@@ -339,9 +480,6 @@ class MemoryCentricOrchestrator:
                 self.memory.successful_output = result['output']
                 self.memory.total_execution_time = time.time() - self.memory.start_time
 
-                if save_memory_path:
-                    self.memory.save(save_memory_path)
-
                 if self.logger:
                     self.logger.log_event('simulation_success',
                                          iterations=self.memory.iteration_count,
@@ -359,13 +497,17 @@ class MemoryCentricOrchestrator:
                     'fallback_level': self.memory.fallback_level
                 }
 
-            # REFLECT Phase: Diagnose failure
-            error_context = self.executor.extract_error_context(result)
+            # REFLECT Phase: Diagnose failure (reuse the context _execute_iteration recorded)
+            errors = self.memory.errors
+            if errors and errors[-1]['result'] is result:
+                error_context = errors[-1]['context']
+            else:
+                error_context = self.executor.extract_error_context(result)
             error_class = error_context['error_class']
 
             # Phase 3.1: Track error class attempts
             attempts = self.memory.increment_error_attempts(error_class)
-            max_allowed = self.ERROR_CLASS_MAX_ATTEMPTS.get(error_class, 3)
+            max_allowed = self._error_limit(error_class, 3)
 
             # Check if we should escalate (too many attempts)
             if self.memory.should_escalate(error_class, max_allowed):
@@ -377,26 +519,14 @@ class MemoryCentricOrchestrator:
 
                 escalation_result = self._handle_error_escalation(error_class, attempts, "Max attempts exceeded")
 
-                # Phase 3.2: Check if fallback retry is requested
-                if escalation_result.get('fallback_retry'):
-                    # Reset error counters for new fallback level
-                    self.memory.error_class_attempts = {}
-                    self.diagnoser.clear_fix_history()
-
-                    if self.logger:
-                        self.logger.log_event('fallback_retry',
-                                             level=escalation_result['new_level'],
-                                             message=escalation_result['message'])
-
-                    # Continue iteration with new fallback level
+                # Phase 3.2: Continue at the new fallback level, or give up if none is left
+                if self._apply_fallback_retry(escalation_result):
                     continue
-                else:
-                    # No fallback available, return error
-                    return escalation_result
+                return escalation_result
 
             # Diagnose with no-repeat patch guard
-            diagnosis = self._diagnose_failure(result)
-            self.memory.diagnoses.append(diagnosis)
+            diagnosis = self._diagnose_failure(result, error_context)
+            self._record('diagnoses', diagnosis)
 
             # Check if diagnosis flagged escalation (no novel fixes)
             if diagnosis.get('escalate'):
@@ -408,22 +538,10 @@ class MemoryCentricOrchestrator:
 
                 escalation_result = self._handle_error_escalation(error_class, attempts, diagnosis.get('escalate_reason', 'No novel fixes'))
 
-                # Phase 3.2: Check if fallback retry is requested
-                if escalation_result.get('fallback_retry'):
-                    # Reset error counters for new fallback level
-                    self.memory.error_class_attempts = {}
-                    self.diagnoser.clear_fix_history()
-
-                    if self.logger:
-                        self.logger.log_event('fallback_retry',
-                                             level=escalation_result['new_level'],
-                                             message=escalation_result['message'])
-
-                    # Continue iteration with new fallback level
+                # Phase 3.2: Continue at the new fallback level, or give up if none is left
+                if self._apply_fallback_retry(escalation_result):
                     continue
-                else:
-                    # No fallback available, return error
-                    return escalation_result
+                return escalation_result
 
             # REVISE Phase: Apply fixes and record
             revision_applied = self._apply_revisions(pv_spec, diagnosis, error_class)
@@ -462,7 +580,7 @@ class MemoryCentricOrchestrator:
                 raise ValueError(f"Invalid fallback level: {fallback_level}")
 
             self.memory.current_code = code
-            self.memory.code_versions.append({
+            self._record('code_versions', {
                 'iteration': self.memory.iteration_count,
                 'code': code,
                 'fallback_level': fallback_level,
@@ -483,7 +601,7 @@ class MemoryCentricOrchestrator:
         )
 
         # Log execution
-        self.memory.execution_traces.append({
+        self._record('execution_traces', {
             'iteration': self.memory.iteration_count,
             'result': exec_result,
             'timestamp': time.time()
@@ -492,7 +610,7 @@ class MemoryCentricOrchestrator:
         if not exec_result['success']:
             # Extract and store error
             error_context = self.executor.extract_error_context(exec_result)
-            self.memory.errors.append({
+            self._record('errors', {
                 'iteration': self.memory.iteration_count,
                 'context': error_context,
                 'result': exec_result
@@ -500,27 +618,27 @@ class MemoryCentricOrchestrator:
 
         return exec_result
 
-    def _diagnose_failure(self, result: Dict[str, Any]) -> Dict[str, Any]:
+    def _diagnose_failure(self, result: Dict[str, Any],
+                          error_context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Diagnose execution failure.
 
         Args:
             result: Failed execution result
+            error_context: Context already extracted from result, if any
 
         Returns:
             Diagnosis dict
         """
-        # Get error context
-        error_context = self.executor.extract_error_context(result)
-
-        # Get previous fixes for learning
-        previous_fixes = [f['diagnosis'].get('fixes', []) for f in self.memory.diagnoses]
+        if error_context is None:
+            error_context = self.executor.extract_error_context(result)
 
-        # Diagnose
+        # Diagnose, learning from previous fixes (accumulated once per diagnosis)
         diagnosis = self.diagnoser.diagnose(
             code=self.memory.current_code,
             error_context=error_context,
-            previous_fixes=previous_fixes
+            previous_fixes=self.memory.previous_fixes
         )
+        self.memory.previous_fixes.append(diagnosis.get('fixes', []))
 
         if self.logger:
             self.logger.log_event('diagnosis_complete',
@@ -553,7 +671,7 @@ class MemoryCentricOrchestrator:
         # Future: Use Input Rewriter Agent to modify spec/code based on fixes
 
         # Log fix attempt
-        self.memory.fixes_attempted.append({
+        self._record('fixes_attempted', {
             'iteration': self.memory.iteration_count,
             'fixes': fixes,
             'timestamp': time.time()
@@ -563,6 +681,28 @@ class MemoryCentricOrchestrator:
         # In full implementation, this would modify pv_spec or code
         return True  # Indicate we tried to apply fixes
 
+    def _apply_fallback_retry(self, escalation_result: Dict[str, Any]) -> bool:
+        """Reset per-class retry state if escalation moved to a new fallback level (Phase 3.2).
+
+        Args:
+            escalation_result: Result of _handle_error_escalation
+
+        Returns:
+            True if the loop should continue at the new level, False if no fallback is left
+        """
+        if not escalation_result.get('fallback_retry'):
+            return False
+
+        # Reset error counters for new fallback level
+        self.memory.error_class_attempts.clear()
+        self.diagnoser.clear_fix_history()
+
+        if self.logger:
+            self.logger.log_event('fallback_retry',
+                                 level=escalation_result['new_level'],
+                                 message=escalation_result['message'])
+        return True
+
     def _handle_error_escalation(self, error_class: str, attempts: int, reason: str) -> Dict[str, Any]:
         """Handle error escalation when max attempts exceeded (Phase 3.1).
 
@@ -581,11 +721,8 @@ class MemoryCentricOrchestrator:
                                  reason=reason,
                                  fallback_level=self.memory.fallback_level)
 
-        # Get error history summary
-        error_summary = {
-            error_class: attempts
-            for error_class, attempts in self.memory.error_class_attempts.items()
-        }
+        # Get error history summary (a snapshot: the counters are cleared in place on fallback retry)
+        error_summary = dict(self.memory.error_class_attempts)
 
         # Phase 3.2: Implement fallback ladder (5 levels)
         current_level = self.memory.fallback_level
@@ -711,4 +848,6 @@ class MemoryCentricOrchestrator:
 
     def reset_memory(self):
         """Reset memory for new simulation."""
+        self.wait_for_save()
         self.memory = SimulationMemory()
+        self._memory_path = None
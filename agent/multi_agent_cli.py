@@ -13,6 +13,9 @@ import re
 import uuid
 import time
 import random
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
 from pathlib import Path
 from typing import List, Dict, Optional
 
@@ -31,8 +34,8 @@ from .prompts import SMALL_TALK_PATTERNS
 from .planner_schema import PLANNER_PROMPT, validate_plan
 from .structured_logger import StructuredLogger
 from . import auth
-from pydantic import TypeAdapter, ValidationError
-from .handoff_schemas import RouterOutput, AgentAction, QAVerdict, NeedAPIAction
+from pydantic import ValidationError
+from .handoff_schemas import RouterOutput, AGENT_ACTION_ADAPTER, QAVerdict, NeedAPIAction
 from .docs_agent import DocsAgent
 from .tools.compliance import check_api_compliance
 from .error_diagnosis import ErrorDiagnosisAgent
@@ -80,6 +83,8 @@ PV Simulation Companion
             self.console = Console()
         else:
             self.console = None
+        # Per-thread label for progress lines (set while plan subtasks run concurrently)
+        self._output_prefix = threading.local()
 
         # Initialize OpenRouter client
         # Ensure API key is available
@@ -159,6 +164,8 @@ PV Simulation Companion
 
         # Initialize DocsAgent (The Librarian)
         self.docs_agent = DocsAgent()
+        # Background work that overlaps LLM round trips (e.g. loading core API cards)
+        self._background = ThreadPoolExecutor(max_workers=1, thread_name_prefix="helio-prefetch")
 
         # Initialize Diagnoser (The Fixer)
         self.diagnoser = ErrorDiagnosisAgent(llm_client=self.client)
@@ -169,8 +176,22 @@ PV Simulation Companion
         if debug:
             self.print(f"[yellow]DEBUG MODE ENABLED (session: {self.session_id}, seed: {self.seed}, temp: {self.temperature})[/yellow]")
 
+    @contextmanager
+    def output_prefix(self, prefix: str):
+        """Label every progress line printed by this thread (e.g. with a subtask id)."""
+        self._output_prefix.value = prefix
+        try:
+            yield
+        finally:
+            self._output_prefix.value = ""
+
     def print(self, text: str, style: str = ""):
         """Print with rich formatting if available."""
+        prefix = getattr(self._output_prefix, "value", "")
+        if prefix:
+            # Keep leading blank lines before the label
+            body = text.lstrip("\n")
+            text = text[:len(text) - len(body)] + prefix + body
         if self.console:
             self.console.print(text, style=style)
         else:
@@ -222,6 +243,18 @@ PV Simulation Companion
 
         return None
 
+    def _prefetch_core_cards(self) -> Future:
+        """Start loading core API cards while the first LLM call is in flight."""
+        return self._background.submit(self.docs_agent.get_core_cards)
+
+    @staticmethod
+    def _collect_core_cards(pending: Future) -> List[Dict]:
+        """Result of _prefetch_core_cards (a fresh list), or [] if loading failed."""
+        try:
+            return pending.result()
+        except Exception:
+            return []
+
     def deterministic_compare(self, results: List[Dict], compare_on: str, winner_rule: str) -> Dict:
         """
         Deterministic comparison of simulation results.
@@ -378,6 +411,34 @@ PV Simulation Companion
 
         return plan
 
+    @staticmethod
+    def _render_api_cards(cards: List[Dict], heading: str) -> str:
+        """API cards as a prompt section: the cards' JSON plus an import guide."""
+        section = f"\n{heading}:\n{json.dumps(cards, indent=2)}\n"
+        # Add guidance on importing
+        section += "\nImport Guide:\n"
+        for card in cards:
+            if isinstance(card, dict) and 'import_stmt' in card:
+                section += f"- {card['import_stmt']}\n"
+        return section
+
+    def _with_cache_breakpoints(self, messages: List[Dict], stable_count: int) -> List[Dict]:
+        """
+        Mark the end of the stable prompt prefix (the first stable_count messages).
+
+        OpenAI-style routes cache identical prefixes automatically. Anthropic routes
+        only cache up to an explicit cache_control breakpoint, so the last stable
+        message is sent as a text block carrying one.
+        """
+        if not self.model.startswith("anthropic/"):
+            return messages
+        last = messages[stable_count - 1]
+        marked = {
+            "role": last["role"],
+            "content": [{"type": "text", "text": last["content"], "cache_control": {"type": "ephemeral"}}],
+        }
+        return messages[:stable_count - 1] + [marked] + messages[stable_count:]
+
     def call_simagent(self, context: Dict, feedback: Optional[List[Dict]] = None, 
                      subtask: Optional[Dict] = None, api_cards: Optional[List[Dict]] = None) -> Dict:
         """
@@ -394,37 +455,45 @@ PV Simulation Companion
         internal_retries = 3
         current_feedback = feedback
 
+        # Stable prompt prefix: system prompt, task context and the API cards we started
+        # with. Rendered once and kept byte-identical across retries so provider prompt
+        # caching can reuse it; everything that changes between retries (cards retrieved
+        # during this call, feedback) goes in trailing messages.
+        context_msg = f"Task: {context['task_type']}\n"
+        context_msg += f"Period: {context['period']}\n"
+        context_msg += f"Query: {context['user_query']}\n"
+
+        if context.get('notes'):
+            context_msg += f"Notes: {', '.join(context['notes'])}\n"
+
+        # Add subtask constraints if provided
+        if subtask:
+            context_msg += f"\nSUBTASK: {subtask['id']}\n"
+            context_msg += f"ACTION: {subtask['action']}\n"
+            if 'variant' in subtask:
+                context_msg += f"VARIANT PARAMETERS: {json.dumps(subtask['variant'])}\n"
+            if 'must_return' in subtask:
+                context_msg += f"MUST RETURN: {', '.join(subtask['must_return'])}\n"
+
+        # Add API Cards (Critical for enforcement)
+        if current_api_cards:
+            context_msg += self._render_api_cards(
+                current_api_cards, "ALLOWED APIS (You MUST use these or request new ones)"
+            )
+
+        stable_messages = [
+            {"role": "system", "content": SIMAGENT_PROMPT},
+            {"role": "user", "content": context_msg},
+        ]
+        added_api_cards = []  # Retrieved during this call; sent after the stable prefix
+
         for i in range(internal_retries):
-            messages = [{"role": "system", "content": SIMAGENT_PROMPT}]
-
-            # Build context message
-            context_msg = f"Task: {context['task_type']}\n"
-            context_msg += f"Period: {context['period']}\n"
-            context_msg += f"Query: {context['user_query']}\n"
-
-            if context.get('notes'):
-                context_msg += f"Notes: {', '.join(context['notes'])}\n"
-
-            # Add subtask constraints if provided
-            if subtask:
-                context_msg += f"\nSUBTASK: {subtask['id']}\n"
-                context_msg += f"ACTION: {subtask['action']}\n"
-                if 'variant' in subtask:
-                    context_msg += f"VARIANT PARAMETERS: {json.dumps(subtask['variant'])}\n"
-                if 'must_return' in subtask:
-                    context_msg += f"MUST RETURN: {', '.join(subtask['must_return'])}\n"
-
-            # Add API Cards (Critical for enforcement)
-            if current_api_cards:
-                cards_json = json.dumps(current_api_cards, indent=2)
-                context_msg += f"\nALLOWED APIS (You MUST use these or request new ones):\n{cards_json}\n"
-                # Add guidance on importing
-                context_msg += "\nImport Guide:\n"
-                for card in current_api_cards:
-                    if isinstance(card, dict) and 'import_stmt' in card:
-                        context_msg += f"- {card['import_stmt']}\n"
-
-            messages.append({"role": "user", "content": context_msg})
+            messages = list(stable_messages)
+
+            if added_api_cards:
+                messages.append({"role": "user", "content": self._render_api_cards(
+                    added_api_cards, "ADDITIONAL ALLOWED APIS (retrieved for this task, also allowed)"
+                )})
 
             # Add QA feedback or Compliance feedback if retrying
             if current_feedback:
@@ -443,7 +512,10 @@ PV Simulation Companion
             if self.seed is not None:
                 options["seed"] = self.seed
 
-            response = self.client.chat(messages, temperature=self.temperature, **options)
+            response = self.client.chat(
+                self._with_cache_breakpoints(messages, len(stable_messages)),
+                temperature=self.temperature, **options
+            )
 
             if "error" in response:
                 return {"action": "error", "error": response["error"]}
@@ -454,9 +526,8 @@ PV Simulation Companion
                  return {"action": "error", "error": "SimAgent did not return valid JSON"}
 
             try:
-                # Validate with Pydantic Union
-                adapter = TypeAdapter(AgentAction)
-                action_obj = adapter.validate_python(action_json)
+                # Validate with the discriminated Pydantic Union
+                action_obj = AGENT_ACTION_ADAPTER.validate_python(action_json)
                 
                 # Check action type
                 if action_obj.action == "need_api":
@@ -470,6 +541,7 @@ PV Simulation Companion
                         for card in new_cards:
                             if card['symbol'] not in existing_symbols:
                                 current_api_cards.append(card)
+                                added_api_cards.append(card)
                                 added_count += 1
                         
                         self.print(f"[green]Retrieved {added_count} new API cards[/green]")
@@ -521,6 +593,7 @@ PV Simulation Companion
                              for card in new_cards:
                                  if card['symbol'] not in existing_symbols:
                                      current_api_cards.append(card)
+                                     added_api_cards.append(card)
                                      count += 1
                              
                              if count > 0:
@@ -555,13 +628,18 @@ PV Simulation Companion
         """Validate code and results."""
         self.print("[cyan]-> QAAgent: Validating result...[/cyan]")
 
-        messages = [{"role": "system", "content": QAAGENT_PROMPT}]
+        # Stable prefix (prompt + task context, identical for every iteration of this
+        # query) first; the code and its execution result are the volatile last turn
+        task_context = f"USER QUERY: {context['user_query']}\n\n"
+        task_context += f"TASK TYPE: {context['task_type']}\n"
+        task_context += f"EXPECTED PERIOD: {context['period']}\n\n"
+        messages = [
+            {"role": "system", "content": QAAGENT_PROMPT},
+            {"role": "user", "content": task_context},
+        ]
 
         # Build validation context
-        qa_context = f"USER QUERY: {context['user_query']}\n\n"
-        qa_context += f"TASK TYPE: {context['task_type']}\n"
-        qa_context += f"EXPECTED PERIOD: {context['period']}\n\n"
-        qa_context += f"GENERATED CODE:\n```python\n{code}\n```\n\n"
+        qa_context = f"GENERATED CODE:\n```python\n{code}\n```\n\n"
 
         if exec_result['success']:
             qa_context += f"EXECUTION: SUCCESS\n\n"
@@ -582,7 +660,10 @@ PV Simulation Companion
         if self.seed is not None:
             options["seed"] = self.seed
 
-        response = self.client.chat(messages, temperature=self.temperature, format="json", **options)
+        response = self.client.chat(
+            self._with_cache_breakpoints(messages, 2),
+            temperature=self.temperature, format="json", **options
+        )
 
         if "error" in response:
             return {"verdict": "error", "error": response["error"]}
@@ -657,6 +738,7 @@ PV Simulation Companion
 
         # Step 1: Clarify user prompt -> canonical PV spec
         self.print("\n[bold cyan]Clarifying simulation requirements...[/bold cyan]")
+        core_cards = self._prefetch_core_cards()
 
         try:
             pv_spec, clarification_summary = self.clarifier.clarify(user_message)
@@ -693,11 +775,8 @@ PV Simulation Companion
         qa_feedback = None
         tool_outputs = []
 
-        # Pre-seed session API cards with core pvlib signatures
-        try:
-            session_api_cards = self.docs_agent.get_core_cards()
-        except Exception:
-            session_api_cards = []
+        # Pre-seed session API cards with core pvlib signatures (loaded during clarification)
+        session_api_cards = self._collect_core_cards(core_cards)
 
         while iteration < max_iterations:
             iteration += 1
@@ -813,7 +892,8 @@ PV Simulation Companion
                 "local_ack": True
             }
 
-        # Step 1: Route the query
+        # Step 1: Route the query (core API cards load in the background meanwhile)
+        core_cards = self._prefetch_core_cards()
         routing = self.call_router(user_message)
 
         if routing.get('route') == 'ack':
@@ -858,12 +938,9 @@ PV Simulation Companion
 
         # Pre-seed session API cards with core pvlib signatures
         # This prevents API mismatch drift (e.g., wrong kwarg names)
-        try:
-            session_api_cards = self.docs_agent.get_core_cards()
-            if session_api_cards:
-                self.print(f"[dim]Pre-loaded {len(session_api_cards)} core API cards[/dim]")
-        except Exception:
-            session_api_cards = []
+        session_api_cards = self._collect_core_cards(core_cards)
+        if session_api_cards:
+            self.print(f"[dim]Pre-loaded {len(session_api_cards)} core API cards[/dim]")
 
         while iteration < max_iterations:
             iteration += 1
@@ -5,6 +5,8 @@ This module implements a deterministic executor that follows a planner's decompo
 """
 
 import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Optional
 from .planner_schema import validate_plan
 
@@ -14,6 +16,9 @@ class PlanExecutor:
     Executes a plan by orchestrating SimAgent calls and deterministic comparisons.
     """
 
+    # Upper bound on simulate subtasks run at once (each holds an LLM call or a sandbox run)
+    MAX_PARALLEL_SUBTASKS = 4
+
     def __init__(self, multi_agent):
         """
         Args:
@@ -58,7 +63,36 @@ class PlanExecutor:
             self.ma.print(f"  - {action_desc}")
         self.ma.print("[cyan]======================[/cyan]\n")
 
-        # Execute subtasks
+        # Sibling simulations (e.g. comparison variants) are independent: issue their
+        # SimAgent/QA round trips concurrently and consume the results in plan order
+        simulate_subtasks = [st for st in subtasks if st['action'] == "simulate"]
+        pool = None
+        pending = {}
+        cancel = threading.Event()
+        if len(simulate_subtasks) > 1:
+            pool = ThreadPoolExecutor(max_workers=min(len(simulate_subtasks), self.MAX_PARALLEL_SUBTASKS))
+            pending = {
+                id(st): pool.submit(
+                    self._execute_simulate_labeled, st, base_assumptions, user_message, max_iterations, cancel
+                )
+                for st in simulate_subtasks
+            }
+
+        try:
+            return self._run_subtasks(plan, subtasks, pending, user_message, max_iterations)
+        finally:
+            if pool is not None:
+                # An early exit (failed subtask, explain) drops the remaining siblings' results:
+                # queued ones never start and running ones stop before their next SimAgent call.
+                # Wait for those, so no subtask keeps calling agents or printing after we return.
+                cancel.set()
+                pool.shutdown(wait=True, cancel_futures=True)
+
+    def _run_subtasks(self, plan: Dict, subtasks: List[Dict], pending: Dict, user_message: str,
+                      max_iterations: int) -> Dict:
+        """Walk the subtasks in plan order and build the final result."""
+        task_type = plan['task_type']
+        base_assumptions = plan.get('base_assumptions', {})
         subtask_results = []
         total_iterations = 0
 
@@ -71,10 +105,13 @@ class PlanExecutor:
                 subtask_results.append({"id": subtask['id'], "action": "validate", "result": result})
 
             elif action == "simulate":
-                # Run simulation
-                result = self._execute_simulate(
-                    subtask, base_assumptions, user_message, max_iterations
-                )
+                # Run simulation (or collect the one already running in the background)
+                if id(subtask) in pending:
+                    result = pending[id(subtask)].result()
+                else:
+                    result = self._execute_simulate(
+                        subtask, base_assumptions, user_message, max_iterations
+                    )
                 subtask_results.append({
                     "id": subtask['id'],
                     "action": "simulate",
@@ -162,8 +199,15 @@ class PlanExecutor:
             }
         return {"valid": True}
 
-    def _execute_simulate(self, subtask: Dict, base: Dict, user_message: str, max_iterations: int) -> Dict:
-        """Execute simulation subtask via SimAgent."""
+    def _execute_simulate_labeled(self, subtask: Dict, base: Dict, user_message: str, max_iterations: int,
+                                  cancel: threading.Event) -> Dict:
+        """_execute_simulate for a concurrent sibling: progress lines are prefixed with the subtask id."""
+        with self.ma.output_prefix(f"({subtask['id']}) "):
+            return self._execute_simulate(subtask, base, user_message, max_iterations, cancel)
+
+    def _execute_simulate(self, subtask: Dict, base: Dict, user_message: str, max_iterations: int,
+                          cancel: Optional[threading.Event] = None) -> Dict:
+        """Execute simulation subtask via SimAgent (stops early once cancel is set)."""
         # Build context from base + variant
         context = {
             "user_query": user_message,
@@ -185,6 +229,12 @@ class PlanExecutor:
         qa_feedback = None
 
         while iteration < max_iterations:
+            if cancel is not None and cancel.is_set():
+                return {
+                    "success": False,
+                    "error": "Cancelled: plan ended before this subtask finished",
+                    "iterations": iteration
+                }
             iteration += 1
 
             sim_action = self.ma.call_simagent(context, feedback=qa_feedback, subtask=subtask, api_cards=initial_api_cards)
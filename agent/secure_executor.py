@@ -21,13 +21,14 @@ import os
 import sys
 import ast
 import time
+import hashlib
 import platform
 import shutil
 from pathlib import Path
 from typing import Dict, Optional, List
 
 # Import existing executor for AST checks
-from .executor import PythonExecutor
+from .executor import PythonExecutor, OUTPUT_ENCODING
 
 
 class SecureExecutor(PythonExecutor):
@@ -267,7 +268,6 @@ class SecureExecutor(PythonExecutor):
                 [str(self.python_exe), str(code_file)],
                 capture_output=True,
                 timeout=timeout,
-                text=True,
                 creationflags=subprocess.CREATE_NO_WINDOW if hasattr(subprocess, 'CREATE_NO_WINDOW') else 0
             )
 
@@ -281,8 +281,7 @@ class SecureExecutor(PythonExecutor):
             return subprocess.run(
                 [str(self.python_exe), str(code_file)],
                 capture_output=True,
-                timeout=timeout,
-                text=True
+                timeout=timeout
             )
 
     def execute_sandboxed(self, code: str, timeout: int = 60, deterministic: bool = False) -> Dict:
@@ -336,8 +335,9 @@ class SecureExecutor(PythonExecutor):
             code = self.wrap_with_determinism(code)
 
         # Create temporary files
-        code_file = self.temp_dir / f"code_{hash(code) % 10000}.py"
-        output_file = self.temp_dir / f"output_{hash(code) % 10000}.json"
+        code_key = hashlib.blake2b(code.encode('utf-8'), digest_size=8).hexdigest()
+        code_file = self.temp_dir / f"code_{code_key}.py"
+        output_file = self.temp_dir / f"output_{code_key}.json"
 
         try:
             code_file.write_text(code, encoding='utf-8')
@@ -349,8 +349,7 @@ class SecureExecutor(PythonExecutor):
                 result = subprocess.run(
                     cmd,
                     capture_output=True,
-                    timeout=timeout,
-                    text=True
+                    timeout=timeout
                 )
 
             elif self.sandbox_available and self.system == "darwin":
@@ -359,18 +358,16 @@ class SecureExecutor(PythonExecutor):
                 result = subprocess.run(
                     cmd,
                     capture_output=True,
-                    timeout=timeout,
-                    text=True
+                    timeout=timeout
                 )
                 # If sandbox-exec itself failed (not the code), fall back to basic execution
-                if result.returncode != 0 and "sandbox-exec" in result.stderr.lower():
+                if result.returncode != 0 and b"sandbox-exec" in result.stderr.lower():
                     print("Warning: macOS sandbox-exec failed, falling back to basic subprocess isolation.")
                     self.sandbox_available = False
                     result = subprocess.run(
                         [str(self.python_exe), str(code_file)],
                         capture_output=True,
-                        timeout=timeout,
-                        text=True
+                        timeout=timeout
                     )
 
             elif self.sandbox_available and self.system == "windows":
@@ -382,13 +379,12 @@ class SecureExecutor(PythonExecutor):
                 result = subprocess.run(
                     [str(self.python_exe), str(code_file)],
                     capture_output=True,
-                    timeout=timeout,
-                    text=True
+                    timeout=timeout
                 )
 
-            # Parse output
-            stdout = result.stdout if hasattr(result, 'stdout') else ""
-            stderr = result.stderr if hasattr(result, 'stderr') else ""
+            # Parse output (captured as bytes, decoded once)
+            stdout = result.stdout.decode(OUTPUT_ENCODING, 'replace') if result.stdout else ""
+            stderr = result.stderr.decode(OUTPUT_ENCODING, 'replace') if result.stderr else ""
 
             # Try to parse JSON from stdout
             output_dict = self._parse_json_output(stdout)
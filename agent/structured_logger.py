@@ -10,6 +10,7 @@ Implements best practices from observability guidelines:
 """
 
 import json
+import threading
 import time
 import hashlib
 from typing import Dict, List, Optional, Any
@@ -49,6 +50,27 @@ class StructuredLogger:
         if self.log_file:
             self.log_file.parent.mkdir(parents=True, exist_ok=True)
 
+        # Append handle opened on first write and kept for the session (line-buffered,
+        # so every event is on disk as soon as it is logged); the lock keeps lines whole
+        # when executor worker threads log concurrently
+        self._log_handle = None
+        self._log_lock = threading.Lock()
+
+    def _write_line(self, entry: Dict[str, Any]):
+        """Append one JSON Lines entry to the log file."""
+        line = json.dumps(entry) + "\n"
+        with self._log_lock:
+            if self._log_handle is None:
+                self._log_handle = open(self.log_file, "a", encoding="utf-8", buffering=1)
+            self._log_handle.write(line)
+
+    def close(self):
+        """Close the log file handle (reopened automatically if logging continues)."""
+        with self._log_lock:
+            if self._log_handle is not None:
+                self._log_handle.close()
+                self._log_handle = None
+
     def log_event(
         self,
         agent: str,
@@ -80,8 +102,7 @@ class StructuredLogger:
 
         # Write to log file
         if self.log_file:
-            with open(self.log_file, "a", encoding="utf-8") as f:
-                f.write(json.dumps(entry) + "\n")
+            self._write_line(entry)
 
         # Print to console if debug mode
         if self.debug:
@@ -313,8 +334,7 @@ class StructuredLogger:
                 "step_name": step_name,
                 "report": report
             }
-            with open(self.log_file, "a", encoding="utf-8") as f:
-                f.write(json.dumps(report_entry) + "\n")
+            self._write_line(report_entry)
 
         self.log_event(
             agent="orchestrator",
@@ -1,7 +1,7 @@
 import importlib
 import inspect
 import sys
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Sequence
 from functools import lru_cache
 
 from agent.schemas.api_cards import APICard
@@ -151,7 +151,7 @@ class IntrospectionTool:
         return card
 
     @classmethod
-    def introspect_many(cls, symbols: List[str]) -> List[APICard]:
+    def introspect_many(cls, symbols: Sequence[str]) -> List[APICard]:
         cards = []
         for s in symbols:
             card = cls.introspect_symbol(s)
@@ -49,6 +49,7 @@ setup(
     author_email="fiacrerougieux@gmail.com",
     url="https://github.com/fiacrerougieux/sun-sleuth-dev",
     packages=find_packages(exclude=["tests*", "docs*"]),
+    package_data={"agent": ["prompt_templates/*.txt"]},
     python_requires=">=3.9",
     install_requires=[
         "pvlib>=0.14.0,<0.15.0",
@@ -69,6 +70,12 @@ setup(
             "black>=23.0.0",
             "flake8>=6.0.0",
         ],
+        "speedups": [
+            "orjson>=3.9.0",
+        ],
+        "sandbox": [
+            "pyseccomp>=0.1.2; sys_platform == 'linux'",
+        ],
         "training": [
             # These are large packages, make them optional
             # "torch>=2.1.0",